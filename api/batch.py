@@ -0,0 +1,46 @@
+import io
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+MAX_BATCH_WORKERS = 16
+
+def collect_batch_items(uploaded_files):
+    # Flatten uploaded images and ZIP archives into (name, bytes) pairs
+    items = []
+    for uploaded in uploaded_files:
+        if uploaded.name.lower().endswith(".zip"):
+            with zipfile.ZipFile(io.BytesIO(uploaded.getvalue())) as archive:
+                for info in archive.infolist():
+                    filename = info.filename
+                    basename = filename.rsplit("/", 1)[-1]
+                    if info.is_dir() or filename.startswith("__MACOSX/") or basename.startswith("."):
+                        continue
+                    if not basename.lower().endswith(IMAGE_EXTENSIONS):
+                        continue
+                    items.append((f"{uploaded.name}/{filename}", archive.read(info)))
+        else:
+            items.append((uploaded.name, uploaded.getvalue()))
+    return items
+
+def run_batch(items, submit_fn, max_workers=4):
+    # Submit every item through a bounded thread pool and yield
+    # (index, response, error, elapsed) tuples in completion order
+    def timed_submit(data):
+        start = time.perf_counter()
+        try:
+            return submit_fn(data), None, time.perf_counter() - start
+        except Exception as e:
+            return None, e, time.perf_counter() - start
+
+    max_workers = max(1, min(int(max_workers), MAX_BATCH_WORKERS))
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="okaydoc-batch")
+    try:
+        futures = {executor.submit(timed_submit, data): index for index, (_, data) in enumerate(items)}
+        for future in as_completed(futures):
+            response, error, elapsed = future.result()
+            yield futures[future], response, error, elapsed
+    finally:
+        # Drop queued items if the script run is interrupted mid-batch
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,192 @@
+import threading
+from concurrent.futures import Future
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from api.compression import REQUEST_ENCODINGS, compress, compress_body, configured_encoding
+from api.payload import JSONBody, MultipartBody
+from api.response_cache import ResponseCache, cache_key
+from telemetry.timing import timed
+
+BASE_URLS = {
+    'DEMO': 'https://ekycportaldemo.innov8tif.com',
+    'PRODUCTION': 'https://ekycportal.innov8tif.com',
+}
+
+# (connect, read) timeouts in seconds; OkayDoc with every check enabled can take a while
+CONNECT_TIMEOUT = 10
+READ_TIMEOUT = 180
+DEFAULT_TIMEOUT = (CONNECT_TIMEOUT, READ_TIMEOUT)
+# Probe bodies are empty, so the server answers them quickly
+PROBE_TIMEOUT = (CONNECT_TIMEOUT, 15)
+
+# Sized to cover the largest batch worker pool
+POOL_MAXSIZE = 16
+# Submissions aren't idempotent: a 500/502/504 may come after the server has
+# already stored the upload, so only "try again later" answers are retried
+# (plus connection failures, where nothing was sent)
+RETRY_STATUSES = (429, 503)
+
+# Process-wide, so every Streamlit session, batch worker and CLI run shares them
+_sessions = {}
+_response_cache = None
+# Answers to a compressed body that may mean the server couldn't decode it;
+# nothing was stored, so resending it uncompressed is safe
+UNDECODED_STATUSES = (400, 415)
+# (base_url, path): Future of the request encoding found by probing
+_probes = {}
+_lock = threading.Lock()
+
+def get_session(base_url):
+    # One keep-alive session per base URL
+    with _lock:
+        session = _sessions.get(base_url)
+        if session is None:
+            session = _sessions[base_url] = _new_session()
+        return session
+
+def _new_session():
+    session = requests.Session()
+    retry = Retry(
+        total=3,
+        connect=3,
+        read=0,
+        status=3,
+        backoff_factor=0.5,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(["GET", "POST"]),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_MAXSIZE, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def post(base_url, path, timeout=DEFAULT_TIMEOUT, **kwargs):
+    base_url = base_url.rstrip("/")
+    data = kwargs.get("data")
+    nbytes = len(data) if hasattr(data, "__len__") else None
+    # Streamed bodies are base64-encoded while uploading, so that cost lands here
+    with timed(f"POST {path}", nbytes) as details:
+        response = get_session(base_url).post(base_url + path, timeout=timeout, **kwargs)
+        # requests' elapsed runs from sending the request until the response headers arrive
+        details["server_seconds"] = response.elapsed.total_seconds()
+        details["response_bytes"] = len(response.content)
+    return response
+
+def get_response_cache():
+    global _response_cache
+    with _lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache()
+        return _response_cache
+
+def probe_request_encoding(base_url, path, probe_body):
+    # Once per endpoint; see _probe. Concurrent first submissions to the same
+    # endpoint share one probe; other endpoints don't wait for it.
+    key = (base_url.rstrip("/"), path)
+    with _lock:
+        future = _probes.get(key)
+        owner = future is None
+        if owner:
+            future = _probes[key] = Future()
+    if not owner:
+        return future.result()
+    try:
+        encoding = _probe(*key, probe_body)
+    except requests.RequestException:
+        # Sent uncompressed this time; not remembered, so the next submission probes again
+        encoding = "identity"
+        forget_request_encoding(*key)
+    except BaseException as e:
+        forget_request_encoding(*key)
+        future.set_exception(e)
+        raise
+    future.set_result(encoding)
+    return encoding
+
+def forget_request_encoding(base_url, path):
+    with _lock:
+        _probes.pop((base_url.rstrip("/"), path), None)
+
+def _advertised(response, candidate):
+    # Accept-Encoding on a response lists the codings the server decodes (RFC 7694)
+    advertised = response.headers.get("Accept-Encoding", "")
+    return candidate in {coding.split(";")[0].strip().lower() for coding in advertised.split(",")}
+
+def _probe(base_url, path, probe_body):
+    # Sends an empty body plain and then in each coding. A coding is only taken
+    # on a positive sign that the server decodes it: listed in an
+    # Accept-Encoding response header, or a 2xx answer to the compressed body
+    # where the plain one got a 2xx too. Both requests failing with the same
+    # status proves nothing (a server that ignores Content-Encoding rejects
+    # both), so that counts as unsupported. A throwaway session: no retries,
+    # so an empty probe body is never resent to the real endpoint, and a short
+    # read timeout.
+    headers = {"Content-Type": getattr(probe_body, "content_type", "application/json")}
+    with requests.Session() as session:
+        plain = session.post(base_url + path, data=b"".join(probe_body), headers=headers, timeout=PROBE_TIMEOUT)
+        for candidate in REQUEST_ENCODINGS:
+            if _advertised(plain, candidate):
+                return candidate
+        for candidate in REQUEST_ENCODINGS:
+            response = session.post(
+                base_url + path, data=compress(probe_body, candidate),
+                headers={**headers, "Content-Encoding": candidate}, timeout=PROBE_TIMEOUT
+            )
+            if _advertised(response, candidate) or (response.ok and plain.ok):
+                return candidate
+    return "identity"
+
+def resolve_request_encoding(base_url, path, content_encoding, probe_body):
+    # content_encoding: None for the configured default, "identity", "auto" or a coding
+    encoding = content_encoding or configured_encoding(path)
+    if encoding == "auto":
+        return probe_request_encoding(base_url, path, probe_body)
+    return encoding
+
+def _send_body(base_url, path, body, headers, timeout, use_cache, journey_id, content_encoding=None, probe_body=None, **kwargs):
+    def send():
+        encoding = resolve_request_encoding(base_url, path, content_encoding, probe_body)
+        if encoding == "identity":
+            return post(base_url, path, timeout=timeout, data=body, headers=headers, **kwargs)
+        data = compress_body(body, encoding)
+        probed = (content_encoding or configured_encoding(path)) == "auto"
+        try:
+            response = post(base_url, path, timeout=timeout, data=data, headers={**headers, "Content-Encoding": encoding}, **kwargs)
+        except requests.RequestException:
+            if probed:
+                forget_request_encoding(base_url, path)
+            raise
+        if probed and not response.ok:
+            # A probed coding is never trusted past a failed request: the next
+            # submission probes again, and a body the server may not have
+            # decoded is resent uncompressed
+            forget_request_encoding(base_url, path)
+            if response.status_code in UNDECODED_STATUSES:
+                return post(base_url, path, timeout=timeout, data=body, headers=headers, **kwargs)
+        return response
+    if not use_cache:
+        return send()
+    key = cache_key(path, base_url, journey_id, body.digest())
+    return get_response_cache().fetch(key, path, send)
+
+def post_json(base_url, path, fields, timeout=DEFAULT_TIMEOUT, use_cache=False, content_encoding=None, **kwargs):
+    # Streams the body; see api.payload.JSONBody. With use_cache, identical
+    # submissions are answered from the response cache and coalesced in flight.
+    # content_encoding compresses the body; see api.compression
+    headers = {"Content-Type": "application/json", **kwargs.pop("headers", {})}
+    return _send_body(
+        base_url, path, JSONBody(fields), headers, timeout, use_cache, fields.get("journeyId"),
+        content_encoding=content_encoding, probe_body=JSONBody({}), **kwargs
+    )
+
+def post_multipart(base_url, path, fields, files, timeout=DEFAULT_TIMEOUT, use_cache=False, content_encoding=None, **kwargs):
+    # files: {name: (filename, bytes-like, content_type)}; see api.payload.MultipartBody
+    body = MultipartBody(fields, files)
+    headers = {"Content-Type": body.content_type, **kwargs.pop("headers", {})}
+    return _send_body(
+        base_url, path, body, headers, timeout, use_cache, fields.get("journeyId"),
+        content_encoding=content_encoding, probe_body=MultipartBody({}, {}), **kwargs
+    )
@@ -0,0 +1,62 @@
+import os
+import zlib
+from telemetry.timing import timed
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Request body codings we can produce, most preferred first; HTTP "deflate" is the zlib format
+REQUEST_ENCODINGS = (("zstd",) if zstandard is not None else ()) + ("gzip", "deflate")
+# Base64 text gets back most of its 33% overhead at the fastest levels; higher
+# levels mostly spend CPU on the already-compressed image data inside it
+COMPRESSION_LEVELS = {"zstd": 3, "gzip": 1, "deflate": 1}
+
+# "identity" (no compression), "auto" (probe each endpoint once) or a coding from
+# REQUEST_ENCODINGS. Per endpoint with e.g. OKAYDOC_REQUEST_ENCODING_OKAYDOC=gzip
+DEFAULT_REQUEST_ENCODING = os.environ.get("OKAYDOC_REQUEST_ENCODING", "identity")
+
+def endpoint_name(path):
+    # "/api/ekyc/okayface/v1-1" -> "okayface"
+    parts = path.strip("/").split("/")
+    return parts[2] if len(parts) > 2 else parts[-1]
+
+def configured_encoding(path):
+    return os.environ.get(f"OKAYDOC_REQUEST_ENCODING_{endpoint_name(path).upper()}", DEFAULT_REQUEST_ENCODING)
+
+def compressor(encoding):
+    level = COMPRESSION_LEVELS.get(encoding)
+    if encoding == "gzip":
+        return zlib.compressobj(level, zlib.DEFLATED, 31)
+    if encoding == "deflate":
+        return zlib.compressobj(level)
+    if encoding == "zstd" and zstandard is not None:
+        return zstandard.ZstdCompressor(level=level).compressobj()
+    raise ValueError(f"Unsupported request encoding: {encoding}")
+
+def decompress(data, encoding):
+    if encoding == "gzip":
+        return zlib.decompress(data, 31)
+    if encoding == "deflate":
+        return zlib.decompress(data)
+    if encoding == "zstd" and zstandard is not None:
+        # Streamed frames carry no content size, which ZstdDecompressor.decompress needs
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    raise ValueError(f"Unsupported request encoding: {encoding}")
+
+def compress(body, encoding):
+    # body: a streamed request body (see api.payload), compressed chunk by chunk.
+    # The result is materialized so it has a Content-Length and replays on retry.
+    compressobj = compressor(encoding)
+    chunks = [compressobj.compress(chunk) for chunk in body]
+    chunks.append(compressobj.flush())
+    return b"".join(chunks)
+
+def compress_body(body, encoding):
+    with timed(f"compress {encoding}") as details:
+        data = compress(body, encoding)
+        details["bytes"] = len(data)
+        details["uncompressed_bytes"] = len(body)
+        details["encoding"] = encoding
+    return data
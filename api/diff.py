@@ -0,0 +1,28 @@
+def flatten_json(value, path=""):
+    # {"a": {"b": [1, 2]}} -> {"a.b[0]": 1, "a.b[1]": 2}; empty containers are kept as leaves
+    if isinstance(value, dict) and value:
+        flat = {}
+        for key, item in value.items():
+            flat.update(flatten_json(item, f"{path}.{key}" if path else str(key)))
+        return flat
+    if isinstance(value, list) and value:
+        flat = {}
+        for index, item in enumerate(value):
+            flat.update(flatten_json(item, f"{path}[{index}]"))
+        return flat
+    return {path: value}
+
+def diff_json(left, right):
+    # Field-level differences between two parsed JSON documents, in the order
+    # fields first appear: [{"field", "change", "left", "right"}] with change
+    # one of "changed", "removed" (only in left) or "added" (only in right)
+    left_flat, right_flat = flatten_json(left), flatten_json(right)
+    changes = []
+    for field in {**left_flat, **right_flat}:
+        if field not in right_flat:
+            changes.append({"field": field, "change": "removed", "left": left_flat[field], "right": None})
+        elif field not in left_flat:
+            changes.append({"field": field, "change": "added", "left": None, "right": right_flat[field]})
+        elif left_flat[field] != right_flat[field]:
+            changes.append({"field": field, "change": "changed", "left": left_flat[field], "right": right_flat[field]})
+    return changes
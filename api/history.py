@@ -0,0 +1,172 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from api.client import BASE_URLS
+
+HISTORY_PATH = os.environ.get("OKAYDOC_HISTORY", os.path.join(".cache", "history.sqlite3"))
+# Oldest submissions beyond this many are dropped as new ones are recorded
+MAX_ENTRIES = int(os.environ.get("OKAYDOC_HISTORY_MAX_ENTRIES", 10000))
+PAGE_SIZE = 25
+
+# Columns listed by search(); the response and timings are only read by get()
+SUMMARY_COLUMNS = ("id", "created_at", "endpoint", "environment", "journey_id", "doc_type", "status_code", "from_cache", "total_seconds", "response_bytes", "source")
+
+_history = None
+_lock = threading.Lock()
+
+def environment_for(base_url):
+    base_url = (base_url or "").rstrip("/")
+    for environment, url in BASE_URLS.items():
+        if url == base_url:
+            return environment
+    return base_url or None
+
+class SubmissionHistory:
+    # Local record of every submission and its response, compressed, searchable
+    # by journey ID, docType and uploaded image digest
+    def __init__(self, path=HISTORY_PATH, max_entries=MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS submissions ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, created_at REAL, endpoint TEXT, environment TEXT, "
+                "base_url TEXT, journey_id TEXT, doc_type TEXT, params TEXT, status_code INTEGER, "
+                "from_cache INTEGER, total_seconds REAL, timings TEXT, response BLOB, response_bytes INTEGER, "
+                "content_type TEXT, source TEXT)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS submission_images ("
+                "submission_id INTEGER REFERENCES submissions (id) ON DELETE CASCADE, role TEXT, digest TEXT)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS submissions_journey_id ON submissions (journey_id)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS submissions_doc_type ON submissions (doc_type)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS submission_images_digest ON submission_images (digest)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS submission_images_submission_id ON submission_images (submission_id)")
+
+    def record(self, endpoint, response, base_url=None, journey_id=None, params=None, images=None, timeline=None, source="app"):
+        # images: {role: digest of the uploaded bytes}; returns the new row's id
+        params = dict(params or {})
+        content = response.content
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                f"INSERT INTO submissions ({', '.join(SUMMARY_COLUMNS[1:])}, base_url, params, timings, response, content_type) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    time.time(), endpoint, environment_for(base_url), journey_id, params.get("docType"),
+                    response.status_code, int(getattr(response, "from_cache", False)),
+                    timeline.total_seconds() if timeline is not None else None, len(content), source,
+                    base_url, json.dumps(params),
+                    json.dumps(timeline.stages) if timeline is not None else None,
+                    zlib.compress(content), response.headers.get("Content-Type"),
+                )
+            )
+            submission_id = cursor.lastrowid
+            self._conn.executemany(
+                "INSERT INTO submission_images VALUES (?, ?, ?)",
+                [(submission_id, role, digest) for role, digest in (images or {}).items() if digest]
+            )
+            self._evict(submission_id)
+        return submission_id
+
+    def _evict(self, newest_id):
+        cutoff = newest_id - self.max_entries
+        if cutoff > 0:
+            self._conn.execute("DELETE FROM submission_images WHERE submission_id <= ?", (cutoff,))
+            self._conn.execute("DELETE FROM submissions WHERE id <= ?", (cutoff,))
+
+    def _where(self, journey_id=None, doc_type=None, image_digest=None, endpoint=None, environment=None):
+        clauses, args = [], []
+        if journey_id:
+            clauses.append("journey_id = ?")
+            args.append(journey_id)
+        if doc_type:
+            clauses.append("doc_type = ?")
+            args.append(doc_type)
+        if image_digest:
+            clauses.append("id IN (SELECT submission_id FROM submission_images WHERE digest = ?)")
+            args.append(image_digest)
+        if endpoint:
+            clauses.append("endpoint = ?")
+            args.append(endpoint)
+        if environment:
+            clauses.append("environment = ?")
+            args.append(environment)
+        return clauses, args
+
+    def search(self, before_id=None, limit=PAGE_SIZE, **filters):
+        # Newest first, one page at a time: pass the last id of a page as
+        # before_id for the next. Summary columns only, as dicts.
+        clauses, args = self._where(**filters)
+        if before_id is not None:
+            clauses.append("id < ?")
+            args.append(before_id)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(SUMMARY_COLUMNS)} FROM submissions {where} ORDER BY id DESC LIMIT ?",
+                (*args, limit)
+            ).fetchall()
+        return [dict(zip(SUMMARY_COLUMNS, row)) for row in rows]
+
+    def count(self, **filters):
+        clauses, args = self._where(**filters)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM submissions {where}", args).fetchone()[0]
+
+    def get(self, submission_id):
+        # One submission in full: params, timings, image digests and the
+        # response, parsed as JSON when it is JSON
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(SUMMARY_COLUMNS)}, base_url, params, timings, response, content_type "
+                "FROM submissions WHERE id = ?", (submission_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            images = self._conn.execute(
+                "SELECT role, digest FROM submission_images WHERE submission_id = ?", (submission_id,)
+            ).fetchall()
+        record = dict(zip(SUMMARY_COLUMNS + ("base_url", "params", "timings", "response", "content_type"), row))
+        record["params"] = json.loads(record["params"])
+        record["timings"] = json.loads(record["timings"]) if record["timings"] else []
+        record["images"] = dict(images)
+        content = zlib.decompress(record["response"])
+        try:
+            record["response"] = json.loads(content)
+        except ValueError:
+            record["response"] = content.decode("utf-8", "replace")
+        return record
+
+    def stats(self):
+        # (submissions, stored response bytes)
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(response)), 0) FROM submissions").fetchone()
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM submission_images")
+            self._conn.execute("DELETE FROM submissions")
+
+def get_history():
+    global _history
+    with _lock:
+        if _history is None:
+            _history = SubmissionHistory()
+        return _history
+
+def record_submission(endpoint, response, **details):
+    # Never lets a history write fail the submission it describes
+    try:
+        return get_history().record(endpoint, response, **details)
+    except sqlite3.Error:
+        return None
@@ -1,8 +1,32 @@
+import hashlib
 import json
-import streamlit as st
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from api.client import BASE_URLS, post
 
-def get_journey_id():
-    resp = st.session_state.get('journey_response')
+# How long an issued journey ID is trusted, and how far ahead of that it is
+# refreshed in the background when still in use
+JOURNEY_TTL = int(os.environ.get("OKAYDOC_JOURNEY_TTL_SECONDS", 30 * 60))
+REFRESH_AHEAD = int(os.environ.get("OKAYDOC_JOURNEY_REFRESH_SECONDS", 5 * 60))
+FETCH_WORKERS = 4
+# After a failed fetch, get() re-raises that error instead of logging in again
+# for this long, doubling with each further failure up to FAILURE_BACKOFF_MAX
+FAILURE_BACKOFF = int(os.environ.get("OKAYDOC_JOURNEY_BACKOFF_SECONDS", 30))
+FAILURE_BACKOFF_MAX = 10 * 60
+
+_manager = None
+_lock = threading.Lock()
+
+def request_journey_id(username, password, base_url=None):
+    if base_url is None:
+        base_url = BASE_URLS['DEMO']
+    return post(base_url, "/api/ekyc/journeyid", json={"username": username, "password": password})
+
+def parse_journey_id(resp):
+    # resp is the stored journey response: a decoded JSON dict or raw text
     if isinstance(resp, dict) and 'journeyId' in resp:
         return resp['journeyId']
     elif isinstance(resp, str):
@@ -11,3 +35,177 @@ def get_journey_id():
         except Exception:
             return None
     return None
+
+def fetch_journey_id(username, password, base_url=None):
+    resp = request_journey_id(username, password, base_url=base_url)
+    if resp.status_code != 200:
+        raise RuntimeError(f"Journey ID request failed with status code {resp.status_code}: {resp.text}")
+    journey_id = parse_journey_id(resp.json())
+    if not journey_id:
+        raise RuntimeError(f"Journey ID missing from response: {resp.text}")
+    return journey_id
+
+class JourneyFailure:
+    # The last failed fetch for some credentials, and how many failed in a row
+    def __init__(self, error, attempts):
+        self.error = error
+        self.attempts = attempts
+        self.failed_at = time.time()
+
+    def retry_in(self):
+        backoff = min(FAILURE_BACKOFF * 2 ** (self.attempts - 1), FAILURE_BACKOFF_MAX)
+        return max(backoff - (time.time() - self.failed_at), 0)
+
+class JourneyToken:
+    def __init__(self, journey_id, fetched_at=None):
+        self.journey_id = journey_id
+        self.fetched_at = time.time() if fetched_at is None else fetched_at
+
+    def age(self):
+        return time.time() - self.fetched_at
+
+class JourneyManager:
+    # Journey IDs cached per environment and credentials. A cached ID is reused
+    # until it nears JOURNEY_TTL, then replaced in the background while it is
+    # still served; concurrent fetches for the same credentials share one request.
+    # A failed fetch is remembered with a backoff, so callers on every rerun
+    # don't each send another login. Separately, a pool of distinct IDs can be
+    # pre-fetched for batch runs.
+    def __init__(self, ttl=JOURNEY_TTL, refresh_ahead=REFRESH_AHEAD, fetch=fetch_journey_id):
+        self.ttl = ttl
+        self.refresh_ahead = refresh_ahead
+        self._fetch = fetch
+        self._tokens = {}
+        self._failures = {}
+        self._in_flight = {}
+        self._pools = {}
+        self._pending = {}
+        self._executor = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="okaydoc-journey")
+        self._lock = threading.Lock()
+        self._pool_filled = threading.Condition(self._lock)
+
+    @staticmethod
+    def credential_key(base_url, username, password):
+        # The password only enters the key as a digest
+        return base_url.rstrip("/"), username, hashlib.blake2b(password.encode(), digest_size=16).hexdigest()
+
+    def token(self, base_url, username, password):
+        # The cached token, if any, without fetching
+        with self._lock:
+            return self._tokens.get(self.credential_key(base_url, username, password))
+
+    def get(self, base_url, username, password):
+        # Raises the last fetch error while its backoff lasts
+        key = self.credential_key(base_url, username, password)
+        with self._lock:
+            token = self._tokens.get(key)
+            failure = self._failures.get(key)
+        backing_off = failure is not None and failure.retry_in() > 0
+        if token is None or token.age() >= self.ttl:
+            if backing_off:
+                raise RuntimeError(f"{failure.error} (retrying in {failure.retry_in():.0f}s)")
+            return self._refresh(key, base_url, username, password).result().journey_id
+        if token.age() >= self.ttl - self.refresh_ahead and not backing_off:
+            self._refresh(key, base_url, username, password)
+        return token.journey_id
+
+    def refresh(self, base_url, username, password):
+        # Fetches a new ID now, e.g. on login or when the cached one was
+        # rejected; an explicit request, so it ignores any backoff
+        key = self.credential_key(base_url, username, password)
+        with self._lock:
+            self._tokens.pop(key, None)
+        return self._refresh(key, base_url, username, password).result().journey_id
+
+    def invalidate(self, base_url, username, password):
+        key = self.credential_key(base_url, username, password)
+        with self._lock:
+            self._tokens.pop(key, None)
+            self._failures.pop(key, None)
+            self._pools.pop(key, None)
+
+    def _refresh(self, key, base_url, username, password):
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is None:
+                future = self._in_flight[key] = self._executor.submit(self._fetch_token, key, base_url, username, password)
+        return future
+
+    def _fetch_token(self, key, base_url, username, password):
+        try:
+            token = JourneyToken(self._fetch(username, password, base_url=base_url))
+            with self._lock:
+                self._tokens[key] = token
+                self._failures.pop(key, None)
+            return token
+        except Exception as e:
+            with self._lock:
+                previous = self._failures.get(key)
+                self._failures[key] = JourneyFailure(e, previous.attempts + 1 if previous else 1)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def prefetch(self, base_url, username, password, count):
+        # Tops the pool up to count fresh IDs in the background, counting fetches
+        # already under way, so calling this on every rerun is cheap
+        key = self.credential_key(base_url, username, password)
+        with self._lock:
+            failure = self._failures.get(key)
+            if failure is not None and failure.retry_in() > 0:
+                return 0
+            pool = self._pools.setdefault(key, deque())
+            self._drop_expired(pool)
+            missing = max(count - len(pool) - self._pending.get(key, 0), 0)
+            self._pending[key] = self._pending.get(key, 0) + missing
+        for _ in range(missing):
+            self._executor.submit(self._fill_pool, key, base_url, username, password)
+        return missing
+
+    def take(self, base_url, username, password):
+        # A distinct ID from the pool, waiting for a pre-fetch under way, or
+        # fetched on the spot if none is
+        key = self.credential_key(base_url, username, password)
+        with self._lock:
+            while True:
+                pool = self._pools.get(key)
+                if pool:
+                    self._drop_expired(pool)
+                if pool:
+                    return pool.popleft().journey_id
+                if not self._pending.get(key):
+                    break
+                self._pool_filled.wait()
+        return self._fetch(username, password, base_url=base_url)
+
+    def pool_size(self, base_url, username, password):
+        with self._lock:
+            pool = self._pools.get(self.credential_key(base_url, username, password), ())
+            return sum(1 for token in pool if token.age() < self.ttl)
+
+    def _fill_pool(self, key, base_url, username, password):
+        try:
+            token = JourneyToken(self._fetch(username, password, base_url=base_url))
+        except Exception as e:
+            token = None
+            with self._lock:
+                previous = self._failures.get(key)
+                self._failures[key] = JourneyFailure(e, previous.attempts + 1 if previous else 1)
+        with self._lock:
+            self._pending[key] -= 1
+            if token is not None:
+                self._pools.setdefault(key, deque()).append(token)
+            self._pool_filled.notify_all()
+
+    def _drop_expired(self, pool):
+        while pool and pool[0].age() >= self.ttl:
+            pool.popleft()
+
+def get_journey_manager():
+    # Process-wide, so sessions with the same credentials share IDs and refreshes
+    global _manager
+    with _lock:
+        if _manager is None:
+            _manager = JourneyManager()
+        return _manager
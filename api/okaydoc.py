@@ -1,34 +1,45 @@
-import requests
-import streamlit as st
-import io
-import base64
+from api.client import BASE_URLS, post_json
 
-def submit_okaydoc_api(edited_image, journey_id, api_params, base_url=None):
-    buffered = io.BytesIO()
-    edited_image.save(buffered, format="JPEG", quality=85)
-    img_str = base64.b64encode(buffered.getvalue()).decode("utf-8")
+# Same defaults as the OkayDoc parameters form
+DEFAULT_API_PARAMS = {
+    'docType': 'mykad',
+    'version': '7',
+    'landmarkCheck': 'true',
+    'fontCheck': 'true',
+    'microprintCheck': 'true',
+    'photoSubstitutionCheck': 'true',
+    'icTypeCheck': 'true',
+    'colorMode': 'true',
+    'hologram': 'true',
+    'screenDetection': 'true',
+    'ghostPhotoColorDetection': 'true',
+    'idBlurDetection': 'true',
+    'islamFieldTamperingDetection': 'true',
+    'qualityCheckDetection': 'true'
+}
+
+def submit_okaydoc_api(img_data, journey_id, api_params, base_url=None, use_cache=False, content_encoding=None):
+    # img_data: encoded image bytes or memoryview (see imaging.encode.image_payload)
     payload = {
         "journeyId": journey_id,
         "type": "nonpassport",
-        "idImageBase64Image": img_str,
-        "version": api_params['version'],
-        "docType": api_params['docType'],
-        "landmarkCheck": api_params['landmarkCheck'],
-        "fontCheck": api_params['fontCheck'],
-        "microprintCheck": api_params['microprintCheck'],
-        "photoSubstitutionCheck": api_params['photoSubstitutionCheck'],
-        "icTypeCheck": api_params['icTypeCheck'],
-        "colorMode": api_params['colorMode'],
-        "hologram": api_params['hologram'],
-        "screenDetection": api_params['screenDetection'],
-        "ghostPhotoColorDetection": api_params['ghostPhotoColorDetection'],
-        "idBlurDetection": api_params['idBlurDetection'],
-        "islamFieldTamperingDetection": api_params['islamFieldTamperingDetection'],
-        "qualityCheckDetection": api_params['qualityCheckDetection']
+        "idImageBase64Image": img_data,
+    }
+    payload.update(api_params)
+    if base_url is None:
+        base_url = BASE_URLS['DEMO']
+    return post_json(base_url, "/api/ekyc/okaydoc", payload, use_cache=use_cache, content_encoding=content_encoding)
+
+def submit_passport_api(half_data, full_data, journey_id, country="OTHER", base_url=None, use_cache=False, content_encoding=None):
+    # full_data is optional; both are encoded image bytes or memoryviews
+    payload = {
+        "journeyId": journey_id,
+        "type": "passport",
+        "country": country,
+        "halfSizeImage": half_data
     }
+    if full_data is not None:
+        payload["fullSizeImage"] = full_data
     if base_url is None:
-        base_url = "https://ekycportaldemo.innov8tif.com"
-    api_endpoint = base_url.rstrip("/") + "/api/ekyc/okaydoc"
-    st.info(f"Sending request to API at {api_endpoint} ...")
-    response = requests.post(api_endpoint, json=payload)
-    return response
+        base_url = BASE_URLS['DEMO']
+    return post_json(base_url, "/api/ekyc/okaydoc", payload, use_cache=use_cache, content_encoding=content_encoding)
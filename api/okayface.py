@@ -0,0 +1,15 @@
+from api.client import BASE_URLS, post_multipart
+
+def submit_okayface_api(idcard_data, best_data, journey_id, liveness, base_url=None, use_cache=False, content_encoding=None):
+    # idcard_data/best_data: encoded JPEG bytes or memoryviews
+    files = {
+        'imageIdCard': ('idcard.jpg', idcard_data, 'image/jpeg'),
+        'imageBest': ('best.jpg', best_data, 'image/jpeg')
+    }
+    data = {
+        'journeyId': journey_id,
+        'livenessDetection': liveness
+    }
+    if base_url is None:
+        base_url = BASE_URLS['DEMO']
+    return post_multipart(base_url, "/api/ekyc/okayface/v1-1", data, files, use_cache=use_cache, content_encoding=content_encoding)
@@ -1,37 +1,19 @@
-import requests
-import streamlit as st
-import io
-import base64
+from api.client import BASE_URLS, post_json
 
-def submit_okayid_api(edited_front, edited_back, journey_id, api_params, base_url=None):
-    # Map JPG to JPEG for PIL compatibility
-    format_map = {"JPG": "JPEG", "PNG": "PNG"}
-    img_format = api_params.get('imageFormat', 'JPEG').upper()
-    img_format = format_map.get(img_format, img_format)
-    # Convert RGBA/LA/P to RGB for JPEG
-    if img_format == "JPEG":
-        if edited_front.mode in ("RGBA", "LA", "P"):
-            edited_front = edited_front.convert("RGB")
-        if edited_back.mode in ("RGBA", "LA", "P"):
-            edited_back = edited_back.convert("RGB")
-    buf_front = io.BytesIO()
-    edited_front.save(buf_front, format=img_format)
-    front_b64 = base64.b64encode(buf_front.getvalue()).decode("utf-8")
-    buf_back = io.BytesIO()
-    edited_back.save(buf_back, format=img_format)
-    back_b64 = base64.b64encode(buf_back.getvalue()).decode("utf-8")
-    payload = {
-        "journeyId": journey_id,
-        "base64ImageString": front_b64,
-        "backImage": back_b64,
-        "imageFormat": api_params['imageFormat'],
-        "imageEnabled": api_params['imageEnabled'],
-        "faceImageEnabled": api_params['faceImageEnabled'],
-        "cambodia": api_params['cambodia']
-    }
+# Same defaults as the OkayID parameters form
+DEFAULT_API_PARAMS = {
+    'imageFormat': 'JPG',
+    'imageEnabled': True,
+    'faceImageEnabled': True,
+    'cambodia': False
+}
+
+def submit_okayid_api(front_data, back_data, journey_id, api_params, base_url=None, use_cache=False, content_encoding=None):
+    # front_data/back_data: encoded images in api_params['imageFormat']
+    payload = dict(api_params)
+    payload["journeyId"] = journey_id
+    payload["base64ImageString"] = front_data
+    payload["backImage"] = back_data
     if base_url is None:
-        base_url = "https://ekycportaldemo.innov8tif.com"
-    api_endpoint = base_url.rstrip("/") + "/api/ekyc/okayid"
-    st.info(f"Sending OkayID API request to {api_endpoint} ...")
-    response = requests.post(api_endpoint, json=payload)
-    return response
+        base_url = BASE_URLS['DEMO']
+    return post_json(base_url, "/api/ekyc/okayid", payload, use_cache=use_cache, content_encoding=content_encoding)
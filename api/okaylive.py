@@ -0,0 +1,13 @@
+from api.client import BASE_URLS, post_multipart
+
+def submit_okaylive_api(best_data, journey_id, base_url=None, use_cache=False, content_encoding=None):
+    # best_data: encoded JPEG bytes or memoryview
+    files = {
+        'imageBest': ('best.jpg', best_data, 'image/jpeg')
+    }
+    data = {
+        'journeyId': journey_id
+    }
+    if base_url is None:
+        base_url = BASE_URLS['DEMO']
+    return post_multipart(base_url, "/api/ekyc/okaylive", data, files, use_cache=use_cache, content_encoding=content_encoding)
@@ -0,0 +1,105 @@
+import base64
+import hashlib
+import json
+import uuid
+
+# Multiple of 3 so every chunk base64-encodes without padding; also the
+# slice size used when streaming raw file parts
+B64_CHUNK_SIZE = 3 * 64 * 1024
+BINARY_TYPES = (bytes, bytearray, memoryview)
+
+def _b64_len(nbytes):
+    return 4 * ((nbytes + 2) // 3)
+
+def _iter_b64(data):
+    view = memoryview(data).cast("B")
+    for start in range(0, len(view), B64_CHUNK_SIZE):
+        yield base64.b64encode(view[start:start + B64_CHUNK_SIZE])
+
+class JSONBody:
+    # JSON object request body. Bytes-like values (encoded images) are emitted as
+    # base64 strings chunk by chunk straight from their buffers, so the full
+    # base64 text and JSON document are never materialized. Iterating again
+    # replays the body, which lets urllib3 resend it on retry.
+    def __init__(self, fields):
+        self.fields = fields
+
+    def _parts(self):
+        # (is_binary, data) pairs; binary data is emitted as a base64 string
+        for index, (key, value) in enumerate(self.fields.items()):
+            prefix = b"{" if index == 0 else b","
+            yield False, prefix + json.dumps(key).encode() + b":"
+            if isinstance(value, BINARY_TYPES):
+                yield True, value
+            else:
+                yield False, json.dumps(value).encode()
+        if not self.fields:
+            yield False, b"{"
+        yield False, b"}"
+
+    def digest(self):
+        # Content hash over the raw field data, without base64-encoding it
+        digest = hashlib.blake2b(digest_size=16)
+        for is_binary, data in self._parts():
+            digest.update(b"\x01" if is_binary else b"\x00")
+            digest.update(data)
+        return digest.hexdigest()
+
+    def __len__(self):
+        total = 0
+        for is_binary, data in self._parts():
+            total += _b64_len(memoryview(data).nbytes) + 2 if is_binary else len(data)
+        return total
+
+    def __iter__(self):
+        for is_binary, data in self._parts():
+            if is_binary:
+                yield b'"'
+                yield from _iter_b64(data)
+                yield b'"'
+            else:
+                yield data
+
+class MultipartBody:
+    # multipart/form-data request body. File parts are (filename, data,
+    # content_type) with bytes-like data that is streamed from its buffer
+    # without being copied into the body or written to disk.
+    def __init__(self, fields, files):
+        self.fields = fields
+        self.files = files
+        self.boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+
+    def _parts(self):
+        delimiter = f"--{self.boundary}\r\n".encode()
+        for name, value in self.fields.items():
+            yield delimiter
+            yield f'Content-Disposition: form-data; name="{name}"\r\n\r\n'.encode()
+            yield str(value).encode() + b"\r\n"
+        for name, (filename, data, content_type) in self.files.items():
+            yield delimiter
+            yield f'Content-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'.encode()
+            yield f"Content-Type: {content_type}\r\n\r\n".encode()
+            yield memoryview(data).cast("B")
+            yield b"\r\n"
+        yield f"--{self.boundary}--\r\n".encode()
+
+    def digest(self):
+        # Excludes the random boundary so identical submissions hash alike
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(json.dumps(self.fields, sort_keys=True, default=str).encode())
+        for name, (filename, data, content_type) in self.files.items():
+            digest.update(json.dumps([name, filename, content_type]).encode())
+            digest.update(data)
+        return digest.hexdigest()
+
+    def __len__(self):
+        return sum(memoryview(part).nbytes for part in self._parts())
+
+    def __iter__(self):
+        for part in self._parts():
+            if isinstance(part, memoryview):
+                for start in range(0, len(part), B64_CHUNK_SIZE):
+                    yield part[start:start + B64_CHUNK_SIZE]
+            else:
+                yield part
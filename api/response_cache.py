@@ -0,0 +1,122 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+import requests
+from requests.structures import CaseInsensitiveDict
+
+CACHE_PATH = os.environ.get("OKAYDOC_RESPONSE_CACHE", os.path.join(".cache", "responses.sqlite3"))
+DEFAULT_TTL = 60 * 60
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+def cache_key(endpoint, base_url, journey_id, payload_digest):
+    return hashlib.blake2b(
+        json.dumps([endpoint, base_url.rstrip("/"), journey_id, payload_digest]).encode(),
+        digest_size=16
+    ).hexdigest()
+
+def _cached_response(row):
+    status_code, headers, content, url, created_at = row
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers = CaseInsensitiveDict(json.loads(headers))
+    response._content = content
+    response.url = url
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    response.from_cache = True
+    response.cached_at = created_at
+    return response
+
+class ResponseCache:
+    # Persistent cache of successful API responses with TTL and size-bounded
+    # LRU eviction. Concurrent requests for the same key share one round trip.
+    def __init__(self, path=CACHE_PATH, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, endpoint TEXT, status_code INTEGER, headers TEXT, "
+                "content BLOB, url TEXT, created_at REAL, accessed_at REAL, size INTEGER)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+
+    def get(self, key):
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT status_code, headers, content, url, created_at FROM responses WHERE key = ? AND created_at > ?",
+                (key, now - self.ttl)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        return _cached_response(row)
+
+    def put(self, key, endpoint, response):
+        if not 200 <= response.status_code < 300:
+            return
+        now = time.time()
+        content = response.content
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, endpoint, response.status_code, json.dumps(dict(response.headers)),
+                 content, response.url, now, now, len(content))
+            )
+            self._evict(now)
+
+    def _evict(self, now):
+        self._conn.execute("DELETE FROM responses WHERE created_at <= ?", (now - self.ttl,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall():
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def fetch(self, key, endpoint, send):
+        # Cached response, a duplicate request's in-flight result, or send()
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        with self._lock:
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[key] = future
+        if not owner:
+            return future.result()
+        try:
+            response = send()
+            response.from_cache = False
+            self.put(key, endpoint, response)
+            future.set_result(response)
+            return response
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
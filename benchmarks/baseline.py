@@ -0,0 +1,64 @@
+# Stored benchmark baselines. Each benchmark owns a section of the JSON file:
+#
+#   {"load": {"okaydoc": {"p95_ms": 412.0, ...}}, "pipeline": {...}, "_machine": {...}}
+#
+# Baselines are only meaningful on the machine that recorded them, so record
+# them on the CI runner (--save-baseline) and compare there (--compare).
+import json
+import os
+import platform
+import statistics
+import PIL
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines.json")
+# Allowed slowdown before a metric counts as a regression
+DEFAULT_TOLERANCE = 0.2
+# Metrics where bigger is better; everything else is a cost
+HIGHER_IS_BETTER = ("throughput_per_s",)
+
+def percentile(values, pct):
+    # Linear interpolation between closest ranks, like numpy's default
+    values = sorted(values)
+    if not values:
+        return None
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[pct - 1]
+
+def machine_info():
+    return {"python": platform.python_version(), "pillow": PIL.__version__, "machine": platform.machine(), "system": platform.system(), "cpus": os.cpu_count()}
+
+def load_baselines(path=BASELINE_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def save_baseline(section, results, path=BASELINE_PATH):
+    baselines = load_baselines(path)
+    baselines.setdefault(section, {}).update(results)
+    baselines["_machine"] = machine_info()
+    with open(path, "w") as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+def compare(section, results, path=BASELINE_PATH, tolerance=DEFAULT_TOLERANCE):
+    # Returns human-readable regressions; empty when everything is within tolerance
+    baselines = load_baselines(path)
+    if section not in baselines:
+        raise SystemExit(f"no '{section}' baseline in {path}; record one with --save-baseline")
+    if baselines.get("_machine") != machine_info():
+        print(f"warning: baseline was recorded on {baselines.get('_machine')}, this is {machine_info()}")
+    regressions = []
+    for name, metrics in results.items():
+        for metric, value in metrics.items():
+            expected = baselines[section].get(name, {}).get(metric)
+            if not isinstance(expected, (int, float)) or not isinstance(value, (int, float)) or not expected:
+                continue
+            if metric in HIGHER_IS_BETTER:
+                worse = value < expected * (1 - tolerance)
+            else:
+                worse = value > expected * (1 + tolerance)
+            if worse:
+                regressions.append(f"{name} {metric}: {value:.1f} vs baseline {expected:.1f}")
+    return regressions
@@ -0,0 +1,111 @@
+# Auto-crop cost and accuracy on the reference images, straight and rotated:
+# draft-mode decode plus detection (what an uncached imaging.autocrop.detect_crop
+# does), detection on an already decoded full-resolution image, and the
+# cached lookup. Accuracy is the detected crop box against the card drawn by
+# benchmarks.reference, after straightening.
+#
+#   python -m benchmarks.bench_autocrop [--images id-scan phone-photo] [--repeat 5] [--budget-ms 100] [--save-baseline | --compare]
+#
+# Exits non-zero if decode + detection on any image exceeds --budget-ms, or
+# if a box is off by more than --max-error px (at full resolution).
+import argparse
+import io
+import statistics
+import sys
+import time
+from PIL import Image
+from benchmarks.baseline import DEFAULT_TOLERANCE, compare, save_baseline
+from benchmarks.reference import REFERENCE_IMAGES, document_image
+from imaging.autocrop import DETECT_MAX_EDGE, detect_crop, detect_document
+from imaging.loader import load_preview
+
+ANGLES = (0, 4, -9)
+BACKGROUND = (80, 90, 100)
+
+def run_times(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {"median_ms": statistics.median(timings), "min_ms": min(timings)}
+
+def card_box(size):
+    # Where benchmarks.reference.document_image draws the card
+    width, height = size
+    return (width // 10, height // 8, width * 9 // 10, height * 7 // 8)
+
+def rotated_bytes(name, angle):
+    size, quality = REFERENCE_IMAGES[name]
+    image = document_image(size)
+    if angle:
+        image = image.rotate(angle, resample=Image.BICUBIC, fillcolor=BACKGROUND)
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=quality)
+    return buffer.getvalue()
+
+def bench_image(name, repeat):
+    results = {}
+    expected = card_box(REFERENCE_IMAGES[name][0])
+    for angle in ANGLES:
+        data = rotated_bytes(name, angle)
+        label = f"{name} {angle:+d}deg"
+        results[f"{label} decode+detect"] = run_times(lambda: detect_document(load_preview(data, DETECT_MAX_EDGE)[0]), repeat)
+        decoded = Image.open(io.BytesIO(data))
+        decoded.load()
+        results[f"{label} detect full-resolution"] = run_times(lambda: detect_document(decoded), repeat)
+        detect_crop(data)
+        results[f"{label} cached"] = run_times(lambda: detect_crop(data), repeat)
+
+        detected = detect_crop(data)
+        if detected is None:
+            results[f"{label} accuracy"] = {"box_error_px": None, "angle_error_deg": None}
+        else:
+            # The straightened card is where it was drawn before rotating
+            results[f"{label} accuracy"] = {
+                "box_error_px": max(abs(a - b) for a, b in zip(detected["crop_box"], expected)),
+                "angle_error_deg": round(abs(detected["rotate"] + angle), 2),
+            }
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark document detection and deskew")
+    parser.add_argument("--images", nargs="+", choices=sorted(REFERENCE_IMAGES), default=sorted(REFERENCE_IMAGES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=100.0, help="Limit for decode + detection per image")
+    parser.add_argument("--max-error", type=int, default=40, help="Limit for the crop box error, px")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true", help="Exit non-zero if any stage regressed past --tolerance")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    results = {}
+    failures = []
+    print(f"{'stage':<45} {'median ms':>10} {'min ms':>9}")
+    for name in args.images:
+        for stage, metrics in bench_image(name, args.repeat).items():
+            results[stage] = metrics
+            if "median_ms" in metrics:
+                print(f"{stage:<45} {metrics['median_ms']:>10.1f} {metrics['min_ms']:>9.1f}")
+                if stage.endswith("decode+detect") and metrics["median_ms"] > args.budget_ms:
+                    failures.append(f"{stage} took {metrics['median_ms']:.1f} ms, budget {args.budget_ms:.0f} ms")
+            else:
+                print(f"{stage:<45} box off by {metrics['box_error_px']} px, angle off by {metrics['angle_error_deg']} deg")
+                if metrics["box_error_px"] is None or metrics["box_error_px"] > args.max_error:
+                    failures.append(f"{stage}: box off by {metrics['box_error_px']} px, limit {args.max_error} px")
+
+    if args.save_baseline:
+        save_baseline("autocrop", results)
+        print("baseline saved")
+    if args.compare:
+        regressions = compare("autocrop", results, tolerance=args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        failures += regressions
+    for failure in failures:
+        print(f"FAIL {failure}")
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+# Load-test the headless submit path (pipeline.submit -> api clients) against
+# the local mock portal, per endpoint: p50/p95/p99 latency, throughput and peak RSS.
+#
+#   python -m benchmarks.bench_load [--endpoints okaydoc okayid] [--requests 200] [--concurrency 8]
+#                                   [--latency-ms 200] [--jitter-ms 50] [--error-rate 0.01] [--edits]
+#                                   [--uplink-kbps 4000] [--compression gzip]
+#                                   [--save-baseline | --compare]
+#
+# Without --base-url a mock server is started in a subprocess, so its CPU work
+# does not compete with the client for the GIL. --edits applies a brightness/
+# contrast change so every submission goes through decode, edit and re-encode.
+# --uplink-kbps throttles how fast the mock reads each body, and the upload
+# size per request is taken from the mock's own byte counts, e.g. to compare
+# --compression identity and gzip over a slow office uplink.
+import argparse
+import os
+import subprocess
+import sys
+import threading
+import time
+from api.batch import MAX_BATCH_WORKERS, run_batch
+from api.client import get_session
+from api.compression import REQUEST_ENCODINGS
+from api.journey import fetch_journey_id
+from benchmarks.baseline import DEFAULT_TOLERANCE, compare, percentile, save_baseline
+from benchmarks.reference import REFERENCE_IMAGES, reference_bytes
+from pipeline import ENDPOINTS, NO_EDITS, submit
+
+BENCH_EDITS = dict(NO_EDITS, brightness=1.1, contrast=1.15)
+
+def current_rss():
+    # Resident set size in bytes; falls back to the process-lifetime peak off Linux
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+class RSSSampler:
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, current_rss())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.peak = current_rss()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, current_rss())
+
+def start_mock_server(latency_ms, jitter_ms, error_rate, uplink_kbps):
+    process = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.mock_server", "--port", "0",
+         "--latency-ms", str(latency_ms), "--jitter-ms", str(jitter_ms), "--error-rate", str(error_rate), "--seed", "0",
+         "--uplink-kbps", str(uplink_kbps)],
+        stdout=subprocess.PIPE, text=True
+    )
+    # First line: "mock eKYC portal listening on http://host:port"
+    return process, process.stdout.readline().split()[-1]
+
+def uploaded_bytes(base_url):
+    # Request bytes the mock has received on the wire; None for other servers
+    response = get_session(base_url).get(base_url.rstrip("/") + "/_mock/stats", timeout=10)
+    if response.status_code != 200:
+        return None
+    return sum(path_stats["bytes"] for path_stats in response.json().values())
+
+def load_endpoint(endpoint, images, journey_id, base_url, requests, concurrency, edits, warmup, content_encoding):
+    def submit_item(item_images):
+        return submit(endpoint, item_images, journey_id, base_url=base_url, edits=edits, content_encoding=content_encoding)
+
+    for _ in range(warmup):
+        submit_item(images)
+    items = [(str(i), images) for i in range(requests)]
+    latencies = []
+    failures = 0
+    uploaded_before = uploaded_bytes(base_url)
+    with RSSSampler() as rss:
+        start = time.perf_counter()
+        for _, response, error, elapsed in run_batch(items, submit_item, max_workers=concurrency):
+            latencies.append(elapsed * 1000)
+            failures += error is not None or response.status_code != 200
+        wall = time.perf_counter() - start
+    uploaded_after = uploaded_bytes(base_url)
+    return {
+        "requests": requests,
+        "failures": failures,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "throughput_per_s": requests / wall,
+        "peak_rss_mb": rss.peak / (1024 * 1024),
+        "upload_kb": (uploaded_after - uploaded_before) / requests / 1024 if uploaded_before is not None else None,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the submit path against a mock eKYC portal")
+    parser.add_argument("--endpoints", nargs="+", choices=sorted(ENDPOINTS), default=sorted(ENDPOINTS))
+    parser.add_argument("--image", choices=sorted(REFERENCE_IMAGES), default="id-scan")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8, choices=range(1, MAX_BATCH_WORKERS + 1), metavar=f"1-{MAX_BATCH_WORKERS}")
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--edits", action="store_true", help="Force decode, edit and re-encode on every submission")
+    parser.add_argument("--base-url", help="Use an already running server instead of starting the mock")
+    parser.add_argument("--latency-ms", type=float, default=100)
+    parser.add_argument("--jitter-ms", type=float, default=25)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--uplink-kbps", type=float, default=0, help="Throttle the mock's body reads to this many kbit/s per connection")
+    parser.add_argument("--compression", choices=("identity",) + REQUEST_ENCODINGS, default="identity", help="Request body coding")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true", help="Exit non-zero if any metric regressed past --tolerance")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    process = None
+    base_url = args.base_url
+    if base_url is None:
+        process, base_url = start_mock_server(args.latency_ms, args.jitter_ms, args.error_rate, args.uplink_kbps)
+    try:
+        journey_id = fetch_journey_id("benchmark", "benchmark", base_url=base_url)
+        image_bytes = reference_bytes(args.image)
+        edits = BENCH_EDITS if args.edits else None
+        print(f"{args.requests} request(s) per endpoint at concurrency {args.concurrency} against {base_url}, {args.image} ({len(image_bytes) / 1024:.0f} KB){', with edits' if args.edits else ''}, {args.compression} bodies{f', {args.uplink_kbps:.0f} kbit/s uplink' if args.uplink_kbps else ''}")
+        print(f"{'endpoint':<10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>8} {'RSS MiB':>8} {'KB/req':>8} {'failed':>7}")
+        results = {}
+        for endpoint in args.endpoints:
+            images = {role: image_bytes for role in ENDPOINTS[endpoint]["roles"]}
+            metrics = load_endpoint(endpoint, images, journey_id, base_url, args.requests, args.concurrency, edits, args.warmup, args.compression)
+            name = f"{endpoint} {args.image} c{args.concurrency}{' edits' if args.edits else ''}"
+            if args.compression != "identity":
+                name += f" {args.compression}"
+            if args.uplink_kbps:
+                name += f" {args.uplink_kbps:.0f}kbps"
+            results[name] = metrics
+            upload_kb = f"{metrics['upload_kb']:.0f}" if metrics["upload_kb"] is not None else "-"
+            print(
+                f"{endpoint:<10} {metrics['p50_ms']:>8.1f} {metrics['p95_ms']:>8.1f} {metrics['p99_ms']:>8.1f} "
+                f"{metrics['throughput_per_s']:>8.1f} {metrics['peak_rss_mb']:>8.1f} {upload_kb:>8} {metrics['failures']:>7}"
+            )
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    if args.save_baseline:
+        save_baseline("load", results)
+        print("baseline saved")
+    if args.compare:
+        regressions = compare("load", results, tolerance=args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
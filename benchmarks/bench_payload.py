@@ -0,0 +1,74 @@
+# Compare peak Python heap usage of building an OkayID-style two-image JSON
+# body the old way (getvalue -> b64encode -> decode -> json.dumps -> encode,
+# as requests.post(json=...) does) against streaming it with api.payload.JSONBody.
+#
+#   python -m benchmarks.bench_payload [front_path back_path]
+import argparse
+import base64
+import io
+import json
+import time
+import tracemalloc
+from PIL import Image
+from api.payload import JSONBody
+
+def synthetic_image(size=(4000, 3000)):
+    return Image.merge("RGB", [Image.effect_noise(size, sigma) for sigma in (48, 64, 80)])
+
+def encoded_buffer(image):
+    buffer = io.BytesIO()
+    image.convert("RGB").save(buffer, format="JPEG", quality=95)
+    return buffer
+
+def legacy_body(front_buffer, back_buffer):
+    payload = {
+        "journeyId": "benchmark",
+        "base64ImageString": base64.b64encode(front_buffer.getvalue()).decode(),
+        "backImage": base64.b64encode(back_buffer.getvalue()).decode(),
+        "imageFormat": "JPG",
+    }
+    body = json.dumps(payload, allow_nan=False).encode("utf-8")
+    return len(body)
+
+def streamed_body(front_buffer, back_buffer):
+    payload = {
+        "journeyId": "benchmark",
+        "base64ImageString": front_buffer.getbuffer(),
+        "backImage": back_buffer.getbuffer(),
+        "imageFormat": "JPG",
+    }
+    # Consume the body the way the HTTP connection does, one chunk at a time
+    return sum(len(chunk) for chunk in JSONBody(payload))
+
+def measure(fn, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = fn(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, peak, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark peak memory of JSON body construction")
+    parser.add_argument("images", nargs="*")
+    args = parser.parse_args()
+
+    if len(args.images) >= 2:
+        front, back = (Image.open(path) for path in args.images[:2])
+    else:
+        front = back = synthetic_image()
+    front_buffer, back_buffer = encoded_buffer(front), encoded_buffer(back)
+    image_bytes = front_buffer.getbuffer().nbytes + back_buffer.getbuffer().nbytes
+
+    legacy_size, legacy_peak, legacy_time = measure(legacy_body, front_buffer, back_buffer)
+    streamed_size, streamed_peak, streamed_time = measure(streamed_body, front_buffer, back_buffer)
+
+    mb = 1024 * 1024
+    print(f"encoded images: {image_bytes / mb:.1f} MiB, request body: {legacy_size / mb:.1f} MiB legacy / {streamed_size / mb:.1f} MiB streamed")
+    print(f"{'path':<9} {'peak MiB':>9} {'x images':>9} {'ms':>8}")
+    print(f"{'legacy':<9} {legacy_peak / mb:>9.1f} {legacy_peak / image_bytes:>9.2f} {legacy_time * 1000:>8.1f}")
+    print(f"{'streamed':<9} {streamed_peak / mb:>9.1f} {streamed_peak / image_bytes:>9.2f} {streamed_time * 1000:>8.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# Micro-benchmarks for the image pipeline on the reference images: decode
+# (full and draft-mode preview), image_edit_tools reruns (cold, warm, slider
+# change), the full-resolution edit, every encoder profile and two-image
+# preparation with and without pipeline.prepare_images.
+#
+#   python -m benchmarks.bench_pipeline [--images id-scan phone-photo] [--repeat 5] [--save-baseline | --compare]
+#
+# image_edit_tools runs in Streamlit's bare mode here: widgets return their
+# session_state values and nothing is sent to a browser, so the numbers are
+# the server-side cost of one rerun.
+import argparse
+import statistics
+import sys
+import time
+import streamlit as st
+from streamlit.logger import set_log_level
+from benchmarks.baseline import DEFAULT_TOLERANCE, compare, save_baseline
+from benchmarks.reference import REFERENCE_IMAGES, reference_bytes
+from components.image_edit import PREVIEW_MAX_EDGE, get_edit_cache, image_edit_tools
+from imaging.cache import content_digest
+from imaging.edit import apply_edits
+from imaging.encode import ENCODER_PROFILES, image_payload
+from imaging.loader import load_preview, open_image
+from pipeline import prepare_image, prepare_images
+
+EDITS = {'brightness': 1.2, 'contrast': 1.1, 'margin': 40, 'crop_box': None}
+
+def run_times(fn, repeat, setup=None):
+    timings = []
+    for i in range(repeat):
+        if setup is not None:
+            setup(i)
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {"median_ms": statistics.median(timings), "min_ms": min(timings)}
+
+def set_sliders(brightness, contrast=1.0, margin=0):
+    st.session_state['bench_brightness'] = brightness
+    st.session_state['bench_contrast'] = contrast
+    st.session_state['bench_crop_margin'] = margin
+
+def bench_image(name, repeat):
+    data = reference_bytes(name)
+    digest = content_digest(data)
+    decoded = open_image(data)
+    decoded.load()
+    results = {}
+
+    def decode():
+        open_image(data).load()
+    results["decode"] = run_times(decode, repeat)
+    results["decode preview"] = run_times(lambda: load_preview(data, PREVIEW_MAX_EDGE), repeat)
+
+    def cold_setup(i):
+        # First render of a fresh upload: nothing cached
+        get_edit_cache().clear()
+        set_sliders(1.0)
+    results["edit_tools cold"] = run_times(lambda: image_edit_tools(data, "bench", digest=digest), repeat, cold_setup)
+
+    set_sliders(1.0)
+    image_edit_tools(data, "bench", digest=digest)
+    results["edit_tools warm"] = run_times(lambda: image_edit_tools(data, "bench", digest=digest), repeat)
+
+    # Each rerun moves a slider, so only the proxy is reused
+    results["edit_tools slider"] = run_times(
+        lambda: image_edit_tools(data, "bench", digest=digest), repeat,
+        lambda i: set_sliders(1.0 + (i + 1) / 100, 1.1, 20)
+    )
+
+    results["full-resolution edit"] = run_times(lambda: apply_edits(decoded, **EDITS), repeat)
+    edited = apply_edits(decoded, **EDITS)
+    results["encode passthrough"] = run_times(lambda: image_payload(decoded, data, ENCODER_PROFILES["Original, JPEG for edits"]), repeat)
+    for profile_name, profile in ENCODER_PROFILES.items():
+        # target_bytes profiles binary-search quality, so they cost several encodes
+        results[f"encode {profile_name}"] = run_times(lambda: image_payload(edited, profile=profile), repeat)
+
+    # A two-image submission (OkayID front/back), one image after the other vs side by side
+    pair_profile = ENCODER_PROFILES["JPEG q95 4:4:4"]
+    pair = {role: (lambda: prepare_image(data, EDITS, pair_profile)) for role in ("front", "back")}
+    results["prepare pair sequential"] = run_times(lambda: [task() for task in pair.values()], repeat)
+    results["prepare pair parallel"] = run_times(lambda: prepare_images(pair), repeat)
+    return {f"{name} {stage}": timing for stage, timing in results.items()}
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark decode, edit tools and encoder profiles")
+    parser.add_argument("--images", nargs="+", choices=sorted(REFERENCE_IMAGES), default=sorted(REFERENCE_IMAGES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true", help="Exit non-zero if any stage regressed past --tolerance")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+    # Silence bare-mode "missing ScriptRunContext" warnings
+    set_log_level("error")
+
+    results = {}
+    print(f"{'stage':<58} {'median ms':>10} {'min ms':>9}")
+    for name in args.images:
+        for stage, timing in bench_image(name, args.repeat).items():
+            results[stage] = timing
+            print(f"{stage:<58} {timing['median_ms']:>10.1f} {timing['min_ms']:>9.1f}")
+
+    if args.save_baseline:
+        save_baseline("pipeline", results)
+        print("baseline saved")
+    if args.compare:
+        regressions = compare("pipeline", results, tolerance=args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
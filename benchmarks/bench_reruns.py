@@ -0,0 +1,80 @@
+# Rerun cost of a slider move on the two-image pages (OkayID front/back and
+# Passport half/full) with the reference images uploaded: the whole script, which
+# is what every slider move used to rerun, against one editor fragment, which
+# is what it reruns now.
+#
+#   python -m benchmarks.bench_reruns [--image id-scan] [--repeat 5] [--save-baseline | --compare]
+#
+# AppTest always runs the whole script, so the fragment number is the editor's
+# own time as recorded by components.reruns during those runs, not a
+# fragment-only rerun through the browser protocol.
+import argparse
+import statistics
+import sys
+import time
+from streamlit.testing.v1 import AppTest
+from benchmarks.baseline import DEFAULT_TOLERANCE, compare, save_baseline
+from benchmarks.reference import REFERENCE_IMAGES, reference_bytes
+
+# page: (uploader keys, editor prefixes)
+PAGES = {
+    "OkayID Submitter": (("okayid_front", "okayid_back"), ("front", "back")),
+    "OkayDoc Passport Submitter": (("passport_half", "passport_full"), ("passport_half", "passport_full")),
+}
+
+def uploader(at, key):
+    return next(widget for widget in at.file_uploader if widget.key == key)
+
+def bench_page(page, data, repeat):
+    uploaders, prefixes = PAGES[page]
+    at = AppTest.from_file("../app.py", default_timeout=120)
+    at.run()
+    at.sidebar.selectbox(key="nav_select").set_value(page).run()
+    for key in uploaders:
+        uploader(at, key).set_value((f"{key}.jpg", data, "image/jpeg"))
+    at.run()
+
+    full, fragment = [], []
+    for i in range(repeat):
+        # A slider move on the first editor, as a user adjusting one image would
+        at.slider(key=f"{prefixes[0]}_brightness_slider").set_value(1.0 + (i + 1) / 100)
+        start = time.perf_counter()
+        at.run()
+        full.append((time.perf_counter() - start) * 1000)
+        if at.exception:
+            raise RuntimeError(at.exception[0].message)
+        fragment.append(at.session_state['rerun_ms'][f"{prefixes[0]} editor"][0])
+
+    def summary(timings):
+        return {"median_ms": statistics.median(timings), "min_ms": min(timings)}
+    return {f"{page} full rerun": summary(full), f"{page} editor fragment": summary(fragment)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare full-script and editor-fragment rerun times")
+    parser.add_argument("--image", choices=sorted(REFERENCE_IMAGES), default="id-scan")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true", help="Exit non-zero if any stage regressed past --tolerance")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    data = reference_bytes(args.image)
+    results = {}
+    print(f"{'stage':<50} {'median ms':>10} {'min ms':>9}")
+    for page in PAGES:
+        for stage, timing in bench_page(page, data, args.repeat).items():
+            results[stage] = timing
+            print(f"{stage:<50} {timing['median_ms']:>10.1f} {timing['min_ms']:>9.1f}")
+
+    if args.save_baseline:
+        save_baseline("reruns", results)
+        print("baseline saved")
+    if args.compare:
+        regressions = compare("reruns", results, tolerance=args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# Cold-start and per-rerun overhead of the app, per page. Each sample is a
+# fresh interpreter under `python -X importtime` that loads Streamlit, then
+# runs app.py once with the page selected (the first visit: every import the
+# app and page need) and once more (a rerun: modules are already loaded).
+#
+#   python -m benchmarks.bench_startup [--pages okayid okaydoc] [--repeat 3] [--top 8] [--save-baseline | --compare]
+#
+# "imports ms" is the import time attributed to the app run itself, summed
+# over the outermost imports -X importtime reports after Streamlit is loaded.
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from benchmarks.baseline import DEFAULT_TOLERANCE, compare, save_baseline
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MARKER = "--- app run ---"
+
+# Short name: navigation label in app.py
+PAGES = {
+    "okayid": "OkayID Submitter",
+    "okaydoc": "OkayDoc (Non-Passport) Submitter",
+    "batch": "OkayDoc Batch Submitter",
+    "passport": "OkayDoc Passport Submitter",
+    "okayface": "OkayFace Submitter",
+    "okaylive": "OkayLive Submitter",
+    "history": "Submission History",
+}
+
+RUN_APP = """
+import json, os, sys, time
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app!r}, default_timeout=120)
+at.session_state["nav_select"] = {page!r}
+sys.stderr.flush()
+os.write(2, {marker!r}.encode() + b"\\n")
+start = time.perf_counter()
+at.run()
+first = time.perf_counter() - start
+start = time.perf_counter()
+at.run()
+rerun = time.perf_counter() - start
+if at.exception:
+    raise SystemExit(at.exception[0].message)
+print(json.dumps({{"first_run_ms": first * 1000, "rerun_ms": rerun * 1000}}))
+"""
+
+def parse_importtime(stderr):
+    # Outermost imports after MARKER as {module: cumulative µs}
+    imports = {}
+    seen_marker = False
+    for line in stderr.splitlines():
+        if line == MARKER:
+            seen_marker = True
+        elif seen_marker and line.startswith("import time:"):
+            _, cumulative, name = line[len("import time:"):].split("|")
+            if cumulative.strip().isdigit() and not name.startswith("  "):
+                imports[name.strip()] = imports.get(name.strip(), 0) + int(cumulative)
+    return imports
+
+def sample(page):
+    code = RUN_APP.format(app=os.path.join(ROOT, "app.py"), page=PAGES[page], marker=MARKER)
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    timings = json.loads(proc.stdout.strip().splitlines()[-1])
+    return timings, parse_importtime(proc.stderr)
+
+def bench_page(page, repeat):
+    samples = [sample(page) for _ in range(repeat)]
+    result = {
+        metric: statistics.median(timings[metric] for timings, _ in samples)
+        for metric in ("first_run_ms", "rerun_ms")
+    }
+    result["imports_ms"] = statistics.median(sum(imports.values()) / 1000 for _, imports in samples)
+    return result, samples[-1][1]
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure app cold-start imports and rerun overhead per page")
+    parser.add_argument("--pages", nargs="+", choices=list(PAGES), default=list(PAGES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=0, help="Also list each page's N slowest imports")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true", help="Exit non-zero if any page regressed past --tolerance")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'page':<10} {'first run ms':>13} {'imports ms':>11} {'rerun ms':>9}")
+    for page in args.pages:
+        result, imports = bench_page(page, args.repeat)
+        results[page] = result
+        print(f"{page:<10} {result['first_run_ms']:>13.1f} {result['imports_ms']:>11.1f} {result['rerun_ms']:>9.1f}")
+        for name, micros in sorted(imports.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"    {name:<40} {micros / 1000:>8.1f} ms")
+
+    if args.save_baseline:
+        save_baseline("startup", results)
+        print("baseline saved")
+    if args.compare:
+        regressions = compare("startup", results, tolerance=args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+# Local stand-in for the eKYC portal, for load tests and offline development.
+#
+#   python -m benchmarks.mock_server [--port 8765] [--latency-ms 300] [--jitter-ms 100] [--error-rate 0.02] [--uplink-kbps 2000]
+#   python cli.py run okaydoc ./images --base-url http://127.0.0.1:8765 --journey-id mock
+#
+# Every request body is read in full and sanity-checked the way the portal
+# would reject it (bad JSON, missing image fields, non-multipart uploads).
+# Compressed bodies (Content-Encoding gzip, deflate, zstd if installed, or
+# those given to --accept-encodings) are decoded first; others get a 415.
+# Every POST response lists the accepted codings in Accept-Encoding.
+# --uplink-kbps reads bodies at that rate to imitate a slow client uplink. GET /_mock/stats returns per-path
+# request counts, bytes on the wire and decoded, and the codings seen.
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from api.compression import REQUEST_ENCODINGS, decompress
+
+UPLINK_CHUNK = 16 * 1024
+
+# path: (endpoint name, body kind, required fields)
+ENDPOINTS = {
+    "/api/ekyc/journeyid": ("journeyid", "json", ("username", "password")),
+    "/api/ekyc/okayid": ("okayid", "json", ("journeyId", "base64ImageString")),
+    "/api/ekyc/okaydoc": ("okaydoc", "json", ("journeyId", "type")),
+    "/api/ekyc/okayface/v1-1": ("okayface", "multipart", ("imageIdCard", "imageBest")),
+    "/api/ekyc/okaylive": ("okaylive", "multipart", ("imageBest",)),
+}
+
+def success_body(name, fields):
+    if name == "journeyid":
+        return {"status": "success", "messageCode": "api.success", "journeyId": uuid.uuid4().hex}
+    return {
+        "status": "success",
+        "messageCode": "api.success",
+        "journeyId": fields.get("journeyId"),
+        "endpoint": name,
+        "mock": True,
+    }
+
+class MockState:
+    def __init__(self, latency_ms=0, jitter_ms=0, error_rate=0.0, error_status=503, seed=None, uplink_kbps=0, accept_encodings=REQUEST_ENCODINGS):
+        self.latency_ms = latency_ms
+        self.accept_encodings = tuple(accept_encodings)
+        self.uplink_kbps = uplink_kbps
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {}
+
+    def draw(self):
+        with self.lock:
+            delay_ms = max(0.0, self.random.gauss(self.latency_ms, self.jitter_ms)) if self.jitter_ms else self.latency_ms
+            fail = self.random.random() < self.error_rate
+        return delay_ms / 1000, fail
+
+    def record(self, path, status, nbytes, decoded_bytes, headers):
+        with self.lock:
+            stats = self.stats.setdefault(path, {"requests": 0, "errors": 0, "bytes": 0, "decoded_bytes": 0, "content_encodings": {}})
+            stats["requests"] += 1
+            stats["errors"] += status != 200
+            stats["bytes"] += nbytes
+            stats["decoded_bytes"] += decoded_bytes
+            encoding = headers.get("Content-Encoding", "identity")
+            stats["content_encodings"][encoding] = stats["content_encodings"].get(encoding, 0) + 1
+
+def parse_fields(kind, headers, body):
+    # Returns the request's field names/values, or None if the portal would reject it
+    content_type = headers.get("Content-Type", "")
+    if kind == "json":
+        try:
+            fields = json.loads(body)
+        except ValueError:
+            return None
+        return fields if isinstance(fields, dict) else None
+    if not content_type.startswith("multipart/form-data") or "boundary=" not in content_type:
+        return None
+    boundary = content_type.split("boundary=", 1)[1].strip('"').encode()
+    fields = {}
+    for part in body.split(b"--" + boundary)[1:-1]:
+        head, _, value = part.partition(b"\r\n\r\n")
+        for token in head.decode("latin-1").split(";"):
+            token = token.strip()
+            if token.startswith("name="):
+                fields[token[5:].strip('"')] = value[:-2] if value.endswith(b"\r\n") else value
+    for name, value in fields.items():
+        if isinstance(value, bytes) and len(value) < 256:
+            fields[name] = value.decode("utf-8", "replace")
+    return fields
+
+def make_handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def send_json(self, status, payload, headers=None):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/_mock/stats":
+                with state.lock:
+                    self.send_json(200, state.stats)
+            else:
+                self.send_json(404, {"status": "error", "message": "Not found"})
+
+        def read_body(self):
+            length = int(self.headers.get("Content-Length", 0))
+            if not state.uplink_kbps:
+                return self.rfile.read(length)
+            chunks = []
+            while length > 0:
+                chunk = self.rfile.read(min(UPLINK_CHUNK, length))
+                if not chunk:
+                    break
+                chunks.append(chunk)
+                length -= len(chunk)
+                time.sleep(len(chunk) * 8 / (state.uplink_kbps * 1000))
+            return b"".join(chunks)
+
+        def do_POST(self):
+            wire_body = body = self.read_body()
+            encoding = self.headers.get("Content-Encoding", "identity")
+            spec = ENDPOINTS.get(self.path)
+            if encoding != "identity" and encoding in state.accept_encodings:
+                try:
+                    body = decompress(body, encoding)
+                except Exception:
+                    body = None
+            if encoding != "identity" and encoding not in state.accept_encodings:
+                status, payload = 415, {"status": "error", "message": f"Unsupported Content-Encoding: {encoding}"}
+                body = b""
+            elif body is None:
+                status, payload = 400, {"status": "error", "message": f"Malformed {encoding} body"}
+                body = b""
+            elif spec is None:
+                status, payload = 404, {"status": "error", "message": "Not found"}
+            else:
+                delay, fail = state.draw()
+                time.sleep(delay)
+                name, kind, required = spec
+                fields = parse_fields(kind, self.headers, body)
+                if fail:
+                    status, payload = state.error_status, {"status": "error", "message": "Injected failure"}
+                elif fields is None:
+                    status, payload = 400, {"status": "error", "message": "Malformed request body"}
+                elif any(not fields.get(field) for field in required):
+                    missing = [field for field in required if not fields.get(field)]
+                    status, payload = 400, {"status": "error", "message": f"Missing field(s): {', '.join(missing)}"}
+                else:
+                    status, payload = 200, success_body(name, fields)
+            state.record(self.path, status, len(wire_body), len(body), self.headers)
+            self.send_json(status, payload, {"Accept-Encoding": ", ".join(state.accept_encodings)} if state.accept_encodings else None)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+def make_server(host="127.0.0.1", port=0, **state_kwargs):
+    # port=0 picks a free port; see server.server_address
+    server = ThreadingHTTPServer((host, port), make_handler(MockState(**state_kwargs)))
+    server.daemon_threads = True
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock eKYC portal with configurable latency and error rate")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Standard deviation of the added latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with --error-status")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--uplink-kbps", type=float, default=0, help="Read request bodies at this many kbit/s per connection")
+    parser.add_argument("--accept-encodings", nargs="*", choices=REQUEST_ENCODINGS, default=list(REQUEST_ENCODINGS), help="Request codings to decode")
+    args = parser.parse_args()
+
+    server = make_server(
+        args.host, args.port,
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate, error_status=args.error_status, seed=args.seed,
+        uplink_kbps=args.uplink_kbps, accept_encodings=args.accept_encodings
+    )
+    host, port = server.server_address[:2]
+    print(f"mock eKYC portal listening on http://{host}:{port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+# Deterministic reference images shared by the benchmarks, so numbers are
+# comparable between runs and machines without shipping sample IDs.
+import io
+import random
+from PIL import Image, ImageDraw, ImageFilter
+
+# name: (size, JPEG quality) - a flatbed ID scan and a 12 MP phone photo of a document
+REFERENCE_IMAGES = {
+    "id-scan": ((1600, 1000), 92),
+    "phone-photo": ((4032, 3024), 90),
+}
+
+def document_image(size, seed=0):
+    # Card-like layout on a noisy background: smooth areas, text-like strokes and
+    # sensor noise, so JPEG/PNG sizes and edit costs resemble real uploads
+    rng = random.Random(seed)
+    width, height = size
+    image = Image.merge("RGB", [Image.effect_noise(size, sigma).point(lambda v, o=offset: v // 4 + o) for sigma, offset in ((20, 70), (24, 80), (28, 90))])
+    draw = ImageDraw.Draw(image)
+    card = (width // 10, height // 8, width * 9 // 10, height * 7 // 8)
+    draw.rounded_rectangle(card, radius=width // 40, fill=(214, 222, 236))
+    left, top, right, bottom = card
+    photo = (left + (right - left) // 20, top + (bottom - top) // 4, left + (right - left) // 3, bottom - (bottom - top) // 10)
+    draw.rectangle(photo, fill=(150, 120, 110))
+    line_height = max(4, (bottom - top) // 18)
+    for row in range(8):
+        y = top + (bottom - top) // 5 + row * line_height * 3 // 2
+        x = photo[2] + line_height
+        while x < right - line_height * 2:
+            word = rng.randint(2, 9) * line_height // 2
+            draw.rectangle((x, y, min(x + word, right - line_height), y + line_height), fill=(30, 30, 40))
+            x += word + line_height
+    return image.filter(ImageFilter.GaussianBlur(0.6))
+
+def reference_bytes(name):
+    size, quality = REFERENCE_IMAGES[name]
+    buffer = io.BytesIO()
+    document_image(size).save(buffer, format="JPEG", quality=quality)
+    return buffer.getvalue()
@@ -0,0 +1,114 @@
+# Headless submissions without Streamlit, e.g. for nightly load and regression jobs:
+#
+#   python cli.py journey --username USER
+#   python cli.py run okaydoc ./images --username USER --concurrency 8 --output results.jsonl
+#   python cli.py run okayid ./ids --journey-id ID --param cambodia=true
+#   python cli.py run okaydoc ./images --username USER --journey-per-item
+#
+# Passwords can come from OKAYDOC_PASSWORD instead of the command line.
+import argparse
+import os
+import sys
+from api.batch import MAX_BATCH_WORKERS
+from api.client import BASE_URLS
+from api.compression import REQUEST_ENCODINGS
+from api.journey import get_journey_manager
+from imaging.encode import ENCODER_PROFILES
+from pipeline import ENDPOINTS, NO_EDITS, collect_directory, run_directory
+
+def parse_param(value):
+    key, sep, param = value.partition("=")
+    if not sep:
+        raise argparse.ArgumentTypeError(f"expected key=value, got {value!r}")
+    return key, param
+
+def add_connection_args(parser):
+    parser.add_argument("--env", choices=["demo", "production"], default="demo")
+    parser.add_argument("--base-url", help="Override the environment's base URL, e.g. a mock server")
+    parser.add_argument("--username")
+    parser.add_argument("--password", default=os.environ.get("OKAYDOC_PASSWORD"))
+
+def base_url_from(args):
+    return args.base_url or BASE_URLS[args.env.upper()]
+
+def require_credentials(args, parser):
+    if not (args.username and args.password):
+        parser.error("pass --journey-id, or --username with --password / OKAYDOC_PASSWORD")
+
+def journey_id_from(args, parser):
+    if getattr(args, "journey_id", None):
+        return args.journey_id
+    require_credentials(args, parser)
+    return get_journey_manager().get(base_url_from(args), args.username, args.password)
+
+def journey_per_item_from(args, parser):
+    # Pre-fetches one journey ID per item, so submissions never wait on the login
+    require_credentials(args, parser)
+    manager = get_journey_manager()
+    base_url = base_url_from(args)
+    manager.prefetch(base_url, args.username, args.password, len(collect_directory(args.endpoint, args.directory)))
+    return lambda: manager.take(base_url, args.username, args.password)
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Submit images to the eKYC APIs without the Streamlit UI")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    journey = commands.add_parser("journey", help="Request a journey ID and print it")
+    add_connection_args(journey)
+
+    run = commands.add_parser("run", help="Submit every image in a directory to an endpoint")
+    run.add_argument("endpoint", choices=sorted(ENDPOINTS))
+    run.add_argument("directory", help="Multi-image endpoints pair files by suffix, e.g. id01_front.jpg + id01_back.jpg")
+    add_connection_args(run)
+    run.add_argument("--journey-id")
+    run.add_argument("--journey-per-item", action="store_true", help="Submit each item under its own journey ID (needs credentials)")
+    run.add_argument("--concurrency", type=int, default=4, choices=range(1, MAX_BATCH_WORKERS + 1), metavar=f"1-{MAX_BATCH_WORKERS}")
+    run.add_argument("--output", default="results.jsonl", help="JSON Lines file to append results to")
+    run.add_argument("--profile", choices=sorted(ENCODER_PROFILES), help="Encoder profile (default: the endpoint's)")
+    run.add_argument("--max-edge", type=int, help="Cap on the submitted long edge in px, 0 for none (default: the endpoint's)")
+    run.add_argument("--param", type=parse_param, action="append", default=[], metavar="KEY=VALUE", help="API parameter, repeatable")
+    run.add_argument("--brightness", type=float, default=NO_EDITS["brightness"])
+    run.add_argument("--contrast", type=float, default=NO_EDITS["contrast"])
+    run.add_argument("--margin", type=int, default=NO_EDITS["margin"])
+    run.add_argument("--auto-crop", action="store_true", help="Crop and straighten each image to its detected document outline")
+    run.add_argument("--cache", action="store_true", help="Use the local response cache")
+    run.add_argument("--compression", choices=("identity", "auto") + REQUEST_ENCODINGS, help="Request body coding (default: OKAYDOC_REQUEST_ENCODING)")
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.command == "journey":
+        print(journey_id_from(args, parser))
+        return 0
+
+    if not os.path.isdir(args.directory):
+        parser.error(f"not a directory: {args.directory}")
+    if args.journey_per_item:
+        if args.journey_id:
+            parser.error("--journey-per-item cannot be combined with --journey-id")
+        journey_id = journey_per_item_from(args, parser)
+    else:
+        journey_id = journey_id_from(args, parser)
+    edits = dict(NO_EDITS, brightness=args.brightness, contrast=args.contrast, margin=args.margin)
+    succeeded, total = run_directory(
+        args.endpoint,
+        args.directory,
+        args.output,
+        journey_id,
+        concurrency=args.concurrency,
+        params=dict(args.param),
+        base_url=base_url_from(args),
+        profile=ENCODER_PROFILES[args.profile] if args.profile else None,
+        edits=edits,
+        use_cache=args.cache,
+        max_edge=args.max_edge,
+        content_encoding=args.compression,
+        auto_crop=args.auto_crop
+    )
+    print(f"{succeeded} of {total} submission(s) succeeded; results appended to {args.output}")
+    return 0 if succeeded == total else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
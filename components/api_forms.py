@@ -1,5 +1,9 @@
 import streamlit as st
+from imaging.encode import ENCODER_PROFILES, DEFAULT_PROFILES, MAX_SUBMIT_EDGE, cap_profile, describe_profile
 
+# The forms are fragments so toggling a parameter doesn't rerun the page's image
+# editors; they only hand their values over through session state
+@st.fragment
 def okayid_api_params_form():
     # Initialize session state for each parameter to ensure they persist
     if 'okayid_image_format' not in st.session_state:
@@ -50,6 +54,7 @@ def okayid_api_params_form():
             'cambodia': cambodia
         }
 
+@st.fragment
 def okaydoc_api_params_form():
     with st.expander("API Request Parameters", expanded=False):
         with st.form(key="api_params_form", clear_on_submit=False):
@@ -70,6 +75,7 @@ def okaydoc_api_params_form():
             qualityCheckDetection = st.radio("Quality Check Detection", ["true", "false"], index=0, key="qualityCheckDetection_radio")
             submit_api_params = st.form_submit_button("Save API Parameters")
         if submit_api_params or 'api_params' not in st.session_state:
+            previous_doc_type = st.session_state.get('api_params', {}).get('docType')
             st.session_state['api_params'] = {
                 'docType': doc_type,
                 'version': version,
@@ -86,3 +92,37 @@ def okaydoc_api_params_form():
                 'islamFieldTamperingDetection': islamFieldTamperingDetection,
                 'qualityCheckDetection': qualityCheckDetection
             }
+            # The quality pre-check thresholds depend on the document type
+            if submit_api_params and doc_type != previous_doc_type:
+                st.rerun()
+
+def encoder_profile_sidebar(endpoint):
+    profile_names = list(ENCODER_PROFILES)
+    key = f"encoder_profile_{endpoint}"
+    if key not in st.session_state:
+        st.session_state[key] = DEFAULT_PROFILES[endpoint]
+    profile_name = st.sidebar.selectbox(
+        "Encoder Profile", profile_names,
+        index=profile_names.index(st.session_state[key]),
+        key=f"{key}_select"
+    )
+    st.session_state[key] = profile_name
+    st.sidebar.caption(describe_profile(ENCODER_PROFILES[profile_name]))
+
+    max_edge_key = f"max_submit_edge_{endpoint}"
+    if max_edge_key not in st.session_state:
+        st.session_state[max_edge_key] = MAX_SUBMIT_EDGE[endpoint]
+    max_edge = st.sidebar.number_input(
+        "Max Submit Long Edge (px, 0 = no cap)", 0, 20000, int(st.session_state[max_edge_key]), 256,
+        key=f"{max_edge_key}_input",
+        help="Larger uploads are downscaled before sending instead of passed through as-is."
+    )
+    st.session_state[max_edge_key] = max_edge
+
+def get_max_submit_edge(endpoint):
+    return st.session_state.get(f"max_submit_edge_{endpoint}", MAX_SUBMIT_EDGE[endpoint])
+
+def get_encoder_profile(endpoint):
+    # The selected profile, tightened to the endpoint's submit resolution cap
+    profile_name = st.session_state.get(f"encoder_profile_{endpoint}", DEFAULT_PROFILES[endpoint])
+    return profile_name, cap_profile(ENCODER_PROFILES[profile_name], get_max_submit_edge(endpoint))
@@ -1,13 +1,58 @@
+import os
+import time
 import streamlit as st
-from PIL import ImageEnhance, ImageOps
-from streamlit_cropper import st_cropper
+from components.reruns import is_fragment_rerun, record_rerun
+from imaging.cache import LRUCache, image_nbytes
+from imaging.edit import apply_edits, has_edits, scale_edits
+from imaging.loader import load_preview
+from telemetry.timing import timed
 
-def image_edit_tools(image, prefix):
+EDIT_CACHE_MAX_BYTES = int(os.environ.get("OKAYDOC_PREVIEW_CACHE_MB", 512)) * 1024 * 1024
+# Long edge of the proxy used for on-screen previews (columns are a few hundred px wide)
+PREVIEW_MAX_EDGE = 800
+
+def _entry_nbytes(value):
+    # Proxy entries are stored as (image, scale) pairs
+    return image_nbytes(value[0] if isinstance(value, tuple) else value)
+
+@st.cache_resource(show_spinner=False)
+def get_edit_cache():
+    # Shared by all sessions; entries are keyed on upload content so they never leak between users
+    return LRUCache(EDIT_CACHE_MAX_BYTES, sizeof=_entry_nbytes)
+
+def cached_edit(image, digest, edits):
+    if digest is None:
+        return apply_edits(image, **edits)
+    cache = get_edit_cache()
+    key = (digest, image.size, edits['brightness'], edits['contrast'], edits['margin'], edits['crop_box'], edits.get('rotate', 0.0))
+    edited = cache.get(key)
+    if edited is None:
+        edited = apply_edits(image, **edits)
+        cache.put(key, edited)
+    return edited
+
+def cached_proxy(data, digest):
+    # Decoded straight at preview size (JPEG draft mode) and EXIF-oriented;
+    # the full-resolution image is only decoded on submit
+    if digest is None:
+        return load_preview(data, PREVIEW_MAX_EDGE)
+    cache = get_edit_cache()
+    key = (digest, 'proxy', PREVIEW_MAX_EDGE)
+    proxy = cache.get(key)
+    if proxy is None:
+        proxy = load_preview(data, PREVIEW_MAX_EDGE)
+        cache.put(key, proxy)
+    return proxy
+
+@timed("image_edit_tools")
+def image_edit_tools(data, prefix, digest=None):
+    # data: the uploaded bytes. Returned edits are in full-resolution pixels.
     # Initialize session state for cropping if it doesn't exist
     if f'{prefix}_crop_enabled' not in st.session_state:
         st.session_state[f'{prefix}_crop_enabled'] = False
 
     col1, col2, col3 = st.columns([1, 1, 1])
+    proxy, proxy_scale = cached_proxy(data, digest)
 
     with col1:
         brightness = st.session_state.get(f'{prefix}_brightness', 1.0)
@@ -25,6 +70,12 @@ def image_edit_tools(image, prefix):
         # Conditionally show the 'Enable Cropping' button
         if not st.session_state.get(f'{prefix}_crop_enabled', False):
             if st.button(f"Enable Cropping ({prefix})", key=f"enable_crop_{prefix}"):
+                # Start from the detected document outline, straightened; NumPy
+                # loads with the first detection
+                from imaging.autocrop import detect_crop
+                detected = detect_crop(data, digest)
+                st.session_state[f'{prefix}_auto_crop'] = detected
+                st.session_state[f'{prefix}_rotate'] = detected['rotate'] if detected else 0.0
                 st.session_state[f'{prefix}_crop_enabled'] = True
                 st.rerun()
 
@@ -34,28 +85,47 @@ def image_edit_tools(image, prefix):
             st.session_state[f'{prefix}_contrast'] = 1.0
             st.session_state[f'{prefix}_crop_margin'] = 0
             st.session_state[f'{prefix}_crop_enabled'] = False  # Reset cropping state
+            st.session_state[f'{prefix}_rotate'] = 0.0
+            st.session_state[f'{prefix}_auto_crop'] = None
             st.rerun()
 
     # Determine the base image for processing (original or cropped)
+    rotate = 0.0
     if st.session_state.get(f'{prefix}_crop_enabled', False):
         with col2:
             st.subheader(f"Cropping Tool ({prefix})")
+            detected = st.session_state.get(f'{prefix}_auto_crop')
+            rotate = st.session_state.get(f'{prefix}_rotate', 0.0)
+            # The cropper works on the straightened proxy; crop boxes are in its coordinates
+            base = cached_edit(proxy, digest, {'brightness': 1.0, 'contrast': 1.0, 'margin': 0, 'crop_box': None, 'rotate': rotate}) if rotate else proxy
             
             # Define a max width for the cropper's display to ensure it fits
             max_display_width = 400
-            original_width, original_height = image.size
             
-            if original_width > max_display_width:
-                display_height = int(original_height * (max_display_width / original_width))
-                display_image = image.resize((max_display_width, display_height))
-                scale_factor = original_width / max_display_width
+            if base.width > max_display_width:
+                display_height = int(base.height * (max_display_width / base.width))
+                display_image = base.resize((max_display_width, display_height))
+                scale_factor = base.width / max_display_width / proxy_scale
+            else:
+                display_image = base
+                scale_factor = 1.0 / proxy_scale
+
+            default_coords = None
+            if detected is not None:
+                left, top, right, bottom = (value / scale_factor for value in detected['crop_box'])
+                default_coords = (int(left), int(right), int(top), int(bottom))
+                st.caption(f"Document outline detected{f', straightened by {rotate:.1f}°' if rotate else ''}. Adjust the box if needed.")
             else:
-                display_image = image
-                scale_factor = 1.0
+                st.caption("No document outline found; drag the box to crop.")
+
+            # The cropper component is slow to import and only needed once
+            # cropping is enabled
+            from streamlit_cropper import st_cropper
 
             # Get the crop box from the user on the resized image
             box = st_cropper(
                 display_image,
+                default_coords=default_coords,
                 return_type='box',
                 box_color='#27ae60',
                 key=f'cropper_{prefix}'
@@ -67,23 +137,51 @@ def image_edit_tools(image, prefix):
             right = left + int(box['width'] * scale_factor)
             bottom = top + int(box['height'] * scale_factor)
 
-            # Crop the original, full-resolution image
-            processed_image = image.crop((left, top, right, bottom))
+            crop_box = (left, top, right, bottom)
     else:
-        processed_image = image.copy()
+        crop_box = None
         with col2:
             st.subheader(f"Original Image ({prefix})")
-            st.image(image, caption="Original (Uncropped)", use_container_width=True)
+            st.image(proxy, caption="Original (Uncropped)", use_container_width=True)
+
+    # Edit parameters are expressed in full-resolution pixels
+    edits = {
+        'brightness': st.session_state.get(f'{prefix}_brightness', 1.0),
+        'contrast': st.session_state.get(f'{prefix}_contrast', 1.0),
+        'margin': st.session_state.get(f'{prefix}_crop_margin', 0),
+        'crop_box': crop_box,
+        'rotate': rotate
+    }
 
     with col3:
         st.subheader(f"Final Result Preview ({prefix})")
-        # Apply enhancements to the processed_image
-        preview_img = processed_image.copy()
-        preview_img = ImageEnhance.Brightness(preview_img).enhance(st.session_state.get(f'{prefix}_brightness', 1.0))
-        preview_img = ImageEnhance.Contrast(preview_img).enhance(st.session_state.get(f'{prefix}_contrast', 1.0))
-        margin = st.session_state.get(f'{prefix}_crop_margin', 0)
-        if margin > 0:
-            preview_img = ImageOps.expand(preview_img, border=margin, fill=(0, 0, 0))
+        # Preview the edits on the downscaled proxy; the full-resolution
+        # image is only edited when the user submits
+        preview_img = cached_edit(proxy, digest, scale_edits(edits, proxy_scale))
         st.image(preview_img, caption=f"Edited Image Preview ({prefix})", use_container_width=True)
 
-    return preview_img
+    return edits
+
+@st.fragment
+def image_editor(data, prefix, digest=None, status_label=None, check=None):
+    # image_edit_tools as a fragment: moving a slider reruns this editor only,
+    # not the page, the sidebar or the other image's editor. The returned edits
+    # are only seen by full runs (e.g. the one a submit click starts), which
+    # re-run the fragment inline. check(edits) -> bool decides whether the
+    # page's submit button is disabled; see editor_blocked.
+    started = time.perf_counter()
+    edits = image_edit_tools(data, prefix, digest=digest)
+    if status_label:
+        st.info(f"{status_label}: {'Sending edited image.' if has_edits(edits) else 'Sending original image.'}")
+    if check is not None:
+        blocked = check(edits)
+        changed = st.session_state.get(f'{prefix}_blocked') != blocked
+        st.session_state[f'{prefix}_blocked'] = blocked
+        if changed and is_fragment_rerun():
+            # The submit button lives outside the fragment
+            st.rerun()
+    record_rerun(f"{prefix} editor", started)
+    return edits
+
+def editor_blocked(prefix):
+    return st.session_state.get(f'{prefix}_blocked', False)
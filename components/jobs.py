@@ -0,0 +1,175 @@
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+import streamlit as st
+from components.memory import current_session_id, get_memory_accountant, render_base64_preview
+from components.journey import journey_credentials
+from components.response_panel import render_api_response, render_comparison
+from components.settings import compare_environments
+from api.client import BASE_URLS
+from api.history import record_submission
+from api.journey import get_journey_manager
+from pipeline import Comparison, send_to_environments
+from telemetry.timing import Timeline, current_timeline, export_timeline
+
+JOB_WORKERS = 8
+POLL_INTERVAL = 1.0
+
+class Job:
+    def __init__(self, label, future, timeline, description=None):
+        self.label = label
+        self.description = description
+        self.future = future
+        self.timeline = timeline
+        self.started_at = time.time()
+        self.finished_at = None
+        # Labels of payloads the memory accountant has since discarded
+        self.expired_payloads = []
+
+@st.cache_resource(show_spinner=False)
+def get_job_executor():
+    # Shared by all sessions, so a slow API call never holds up a script rerun
+    return ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="okaydoc-job")
+
+def get_job(key):
+    return st.session_state.get('jobs', {}).get(key)
+
+def job_running(key):
+    job = get_job(key)
+    return job is not None and not job.future.done()
+
+def start_job(key, label, fn, *args, description=None, **kwargs):
+    # Runs fn in the background and keeps the handle in session state under key,
+    # replacing any earlier job there. Stages fn records extend this run's timeline.
+    timeline = current_timeline()
+    timeline = timeline.fork(job=key) if timeline is not None else Timeline(key)
+
+    def run():
+        timeline.activate()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            job.finished_at = time.time()
+            export_timeline(timeline)
+
+    job = Job(label, None, timeline, description)
+    job.future = get_job_executor().submit(run)
+    st.session_state.setdefault('jobs', {})[key] = job
+    return job
+
+def start_submission(key, label, fn, description=None, history=None):
+    # For fn returning (response, {label: encoded payload}). The payloads are
+    # handed to the memory accountant, which may spill them to disk, and those
+    # of this session's previous run under key are released. history holds
+    # api.history.record_submission's details (endpoint, base_url, journey_id,
+    # params, images) for storing the response in the submission history.
+    session_id = current_session_id()
+
+    def run():
+        response, payloads = fn()
+        if history is not None:
+            record_submission(response=response, timeline=current_timeline(), **history)
+        return response, track_payloads(session_id, key, payloads)
+
+    return start_job(key, label, run, description=description)
+
+def track_payloads(session_id, key, payloads):
+    accountant = get_memory_accountant()
+    accountant.release(session_id, f"{key}/")
+    return {
+        name: accountant.track(session_id, f"{key}/{name}", data)
+        for name, data in payloads.items()
+    }
+
+def start_comparison(key, label, prepare, send, targets, description=None, history=None):
+    # Like start_submission, but the payloads from prepare() are encoded once
+    # and sent to every target {environment: (base_url, journey_id)} at the
+    # same time with send(payloads, base_url, journey_id). The job's result is
+    # (pipeline.Comparison, payloads); each environment's response is recorded
+    # in the history separately.
+    session_id = current_session_id()
+
+    def run():
+        payloads = prepare()
+        comparison = send_to_environments(lambda base_url, journey_id: send(payloads, base_url, journey_id), targets)
+        if history is not None:
+            for result in comparison.results.values():
+                if result["response"] is not None:
+                    record_submission(
+                        response=result["response"], timeline=result["timeline"],
+                        **{**history, "base_url": result["base_url"], "journey_id": result["journey_id"]}
+                    )
+        return comparison, track_payloads(session_id, key, payloads)
+
+    return start_job(key, label, run, description=description)
+
+def start_page_submission(key, label, prepare, send, base_url, journey_id, description=None, history=None):
+    # A page's submit button: prepare() -> {label: encoded payload} and
+    # send(payloads, base_url, journey_id) -> response. Sends to the selected
+    # environment, or to every environment when the sidebar's compare mode is
+    # on, each with its own journey ID for the credentials entered there.
+    if not compare_environments():
+        def submit_once():
+            payloads = prepare()
+            return send(payloads, base_url, journey_id), payloads
+        return start_submission(key, label, submit_once, description=description, history=history)
+    manager = get_journey_manager()
+
+    def journey_for(environment, url, credentials):
+        if credentials is None:
+            raise RuntimeError(f"No journey ID for {environment}: select it in the sidebar and get one there first.")
+        return manager.get(url, *credentials)
+
+    targets = {
+        environment: (url, functools.partial(journey_for, environment, url, journey_credentials(url)))
+        for environment, url in BASE_URLS.items()
+    }
+    return start_comparison(key, f"{label} ({' and '.join(targets)})", prepare, send, targets, description=description, history=history)
+
+@st.fragment(run_every=POLL_INTERVAL)
+def _poll_job(key, render_progress):
+    job = get_job(key)
+    if job is None or job.future.done():
+        # Re-render the whole page with the result
+        st.rerun()
+    st.info(f"{job.label} ({time.time() - job.started_at:.0f}s)")
+    if render_progress is not None:
+        render_progress()
+
+def render_job(key, render_result, render_progress=None):
+    # Polls while the job runs; the rest of the page stays interactive
+    job = get_job(key)
+    if job is None:
+        return
+    if not job.future.done():
+        _poll_job(key, render_progress)
+        return
+    error = job.future.exception()
+    if error is not None:
+        st.error(f"An error occurred: {error}")
+        st.exception(error)
+        return
+    render_result(job.future.result(), job)
+
+def render_submission(key, success_message):
+    # For jobs started with start_submission
+    def render_result(result, job):
+        response, payloads = result
+        for label in [label for label, artifact in payloads.items() if artifact.expired]:
+            # Nothing but the size is left; drop the job's reference too
+            del payloads[label]
+            job.expired_payloads.append(label)
+        if job.expired_payloads:
+            st.info(f"{', '.join(job.expired_payloads)} expired after the session was idle. Submit again to see the Base64.")
+        if payloads:
+            sizes = ", ".join(f"{label} {artifact.nbytes / 1024:.0f} KB" for label, artifact in payloads.items())
+            st.caption(f"{job.description}: {sizes}" if job.description else sizes)
+            with st.expander("View Base64 Strings"):
+                for label, artifact in payloads.items():
+                    render_base64_preview(label, artifact, f"{key}_{label}")
+        st.caption(f"Finished in {job.finished_at - job.started_at:.1f}s")
+        if isinstance(response, Comparison):
+            render_comparison(response, success_message)
+        else:
+            render_api_response(response, success_message, timeline=job.timeline)
+    render_job(key, render_result)
@@ -0,0 +1,33 @@
+import streamlit as st
+from api.journey import get_journey_manager
+
+# Credentials are kept per environment (base URL) and only ever used where
+# they were entered, so switching environment never logs in by itself
+def journey_credentials(base_url):
+    return st.session_state.get('journey_credentials', {}).get(base_url)
+
+def journey_login(base_url, username, password):
+    # Fetches a fresh ID; later calls reuse it until it is due for a refresh
+    journey_id = get_journey_manager().refresh(base_url, username, password)
+    st.session_state.setdefault('journey_credentials', {})[base_url] = (username, password)
+    st.session_state['journey_error'] = None
+    return journey_id
+
+def get_journey_id(base_url):
+    # The cached ID for this session's credentials in the environment; only
+    # fetched here when there is none yet or it has expired, and not again
+    # while a failed fetch's backoff lasts
+    credentials = journey_credentials(base_url)
+    if credentials is None:
+        return None
+    try:
+        journey_id = get_journey_manager().get(base_url, *credentials)
+    except Exception as e:
+        st.session_state['journey_error'] = str(e)
+        return None
+    st.session_state['journey_error'] = None
+    return journey_id
+
+def journey_token(base_url):
+    credentials = journey_credentials(base_url)
+    return get_journey_manager().token(base_url, *credentials) if credentials else None
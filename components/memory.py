@@ -0,0 +1,176 @@
+import base64
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+MB = 1024 * 1024
+# Encoded payloads kept for display after a submission; past these budgets the
+# least recently viewed ones are spilled to disk
+SESSION_BUDGET_BYTES = int(os.environ.get("OKAYDOC_SESSION_MEMORY_MB", 64)) * MB
+GLOBAL_BUDGET_BYTES = int(os.environ.get("OKAYDOC_GLOBAL_MEMORY_MB", 512)) * MB
+SPILL_DIR = os.environ.get("OKAYDOC_SPILL_DIR", os.path.join(tempfile.gettempdir(), "okaydoc-spill"))
+# Payloads of sessions untouched this long are dropped; Streamlit has no session-end hook
+IDLE_SECONDS = 3600
+# Base64 shown inline before the download button (a multiple of 3 bytes)
+BASE64_PREVIEW_BYTES = 150
+
+class ArtifactExpired(Exception):
+    # The accountant dropped the payload (idle session or replaced); only its size is left
+    pass
+
+class Artifact:
+    # An encoded payload: in memory until the accountant spills it to a file
+    def __init__(self, session_id, key, data):
+        self.session_id = session_id
+        self.key = key
+        self.data = data
+        self.nbytes = memoryview(data).nbytes
+        self.path = None
+        self.expired = False
+        self.last_used = time.time()
+
+class MemoryAccountant:
+    # Process-wide, thread-safe; artifacts are kept least recently used first
+    def __init__(self, session_budget=SESSION_BUDGET_BYTES, global_budget=GLOBAL_BUDGET_BYTES, spill_dir=SPILL_DIR):
+        self.session_budget = session_budget
+        self.global_budget = global_budget
+        self.spill_dir = spill_dir
+        self._artifacts = OrderedDict()
+        self._lock = threading.Lock()
+
+    def track(self, session_id, key, data):
+        artifact = Artifact(session_id, key, data)
+        with self._lock:
+            self._discard(self._artifacts.pop((session_id, key), None))
+            self._artifacts[(session_id, key)] = artifact
+            self._expire_idle()
+            self._enforce(session_id)
+        return artifact
+
+    def release(self, session_id, prefix):
+        with self._lock:
+            for entry in [entry for entry in self._artifacts if entry[0] == session_id and entry[1].startswith(prefix)]:
+                self._discard(self._artifacts.pop(entry))
+
+    def read(self, artifact, limit=None):
+        # Raises ArtifactExpired once the payload has been discarded
+        with self._lock:
+            entry = (artifact.session_id, artifact.key)
+            if entry in self._artifacts:
+                self._artifacts.move_to_end(entry)
+                artifact.last_used = time.time()
+            data, path = artifact.data, artifact.path
+        if data is not None:
+            return data if limit is None else data[:limit]
+        if path is None:
+            raise ArtifactExpired(artifact.key)
+        try:
+            with open(path, "rb") as f:
+                return f.read(-1 if limit is None else limit)
+        except FileNotFoundError:
+            # Discarded while being read
+            raise ArtifactExpired(artifact.key) from None
+
+    def usage(self, session_id=None):
+        # (bytes held in memory, bytes spilled to disk), for one session or all of them
+        held = spilled = 0
+        with self._lock:
+            for artifact in self._artifacts.values():
+                if session_id is not None and artifact.session_id != session_id:
+                    continue
+                if artifact.data is not None:
+                    held += artifact.nbytes
+                else:
+                    spilled += artifact.nbytes
+        return held, spilled
+
+    def _enforce(self, session_id):
+        # Spill the session's oldest payloads past its budget, then anyone's past the global one
+        in_memory = [artifact for artifact in self._artifacts.values() if artifact.data is not None]
+        total = sum(artifact.nbytes for artifact in in_memory)
+        session_total = sum(artifact.nbytes for artifact in in_memory if artifact.session_id == session_id)
+        for artifact in in_memory:
+            own = artifact.session_id == session_id
+            if not ((own and session_total > self.session_budget) or total > self.global_budget):
+                continue
+            self._spill(artifact)
+            total -= artifact.nbytes
+            if own:
+                session_total -= artifact.nbytes
+
+    def _spill(self, artifact):
+        os.makedirs(self.spill_dir, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=self.spill_dir, suffix=".bin", delete=False) as f:
+            f.write(artifact.data)
+        artifact.path = f.name
+        artifact.data = None
+
+    def _expire_idle(self):
+        cutoff = time.time() - IDLE_SECONDS
+        for entry in [entry for entry, artifact in self._artifacts.items() if artifact.last_used < cutoff]:
+            self._discard(self._artifacts.pop(entry))
+
+    def _discard(self, artifact):
+        if artifact is None:
+            return
+        artifact.data = None
+        artifact.expired = True
+        if artifact.path is not None:
+            try:
+                os.remove(artifact.path)
+            except OSError:
+                pass
+            artifact.path = None
+
+@st.cache_resource(show_spinner=False)
+def get_memory_accountant():
+    return MemoryAccountant()
+
+def current_session_id():
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else "local"
+
+def process_rss():
+    # Resident set size in bytes, where /proc is available
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+def render_base64_preview(label, artifact, key):
+    # Inline only the start of the string; the full text is generated on download
+    accountant = get_memory_accountant()
+    try:
+        head = base64.b64encode(accountant.read(artifact, BASE64_PREVIEW_BYTES)).decode()
+    except ArtifactExpired:
+        st.info(f"{label}: expired after the session was idle. Submit again to see its Base64.")
+        return
+    encoded_chars = 4 * ((artifact.nbytes + 2) // 3)
+    st.caption(f"{label} Base64 ({encoded_chars:,} characters)")
+    st.code(head + ("…" if artifact.nbytes > BASE64_PREVIEW_BYTES else ""), language=None, wrap_lines=True)
+    st.download_button(
+        f"Download {label} Base64",
+        lambda: base64.b64encode(accountant.read(artifact)),
+        file_name=f"{key}.b64.txt",
+        mime="text/plain",
+        on_click="ignore",
+        key=f"{key}_download"
+    )
+
+def memory_usage_sidebar(image_cache):
+    accountant = get_memory_accountant()
+    session_held, session_spilled = accountant.usage(current_session_id())
+    total_held, total_spilled = accountant.usage()
+    lines = [
+        f"This session: {session_held / MB:.1f} MB of payloads in memory, {session_spilled / MB:.1f} MB on disk",
+        f"All sessions: {total_held / MB:.1f} / {accountant.global_budget / MB:.0f} MB payloads, {image_cache.nbytes / MB:.0f} / {image_cache.max_bytes / MB:.0f} MB preview cache",
+    ]
+    rss = process_rss()
+    if rss is not None:
+        lines.append(f"Server process: {rss / MB:.0f} MB resident")
+    st.sidebar.caption("  \n".join(lines))
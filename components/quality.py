@@ -0,0 +1,37 @@
+import streamlit as st
+from components.api_forms import get_encoder_profile
+from components.image_edit import cached_edit, cached_proxy
+from imaging.edit import scale_edits
+
+QUALITY_MODES = ["Warn", "Block", "Off"]
+
+def quality_mode_sidebar():
+    st.sidebar.selectbox(
+        "Quality Pre-check", QUALITY_MODES, key="quality_mode",
+        help="Check blur, exposure and resolution locally before sending. Block stops submissions "
+             "failing the document type's blocking checks."
+    )
+
+def quality_precheck(data, edits, digest, endpoint, doc_type=None):
+    # Runs on the edited preview the editor already holds; returns True when
+    # the submission should be blocked
+    mode = st.session_state.get('quality_mode', "Warn")
+    if mode == "Off":
+        return False
+    # NumPy loads with the first pre-check instead of at startup
+    from imaging.quality import assess_quality, submit_size
+    proxy, proxy_scale = cached_proxy(data, digest)
+    preview = cached_edit(proxy, digest, scale_edits(edits, proxy_scale))
+    full_size = (round(proxy.width / proxy_scale), round(proxy.height / proxy_scale))
+    _, profile = get_encoder_profile(endpoint)
+    metrics, issues = assess_quality(preview, submit_size(full_size, edits, profile.get("max_long_edge")), doc_type)
+
+    blocked = mode == "Block" and any(issue["block"] for issue in issues)
+    for issue in issues:
+        if blocked and issue["block"]:
+            st.error(issue["message"])
+        else:
+            st.warning(issue["message"])
+    if not issues:
+        st.caption(f"Quality pre-check passed (sharpness {metrics['sharpness']:.0f}, brightness {metrics['brightness']:.0f}).")
+    return blocked
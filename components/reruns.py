@@ -0,0 +1,26 @@
+import time
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+def is_fragment_rerun():
+    # True while Streamlit reruns only a fragment, not the whole script
+    ctx = get_script_run_ctx()
+    return ctx is not None and bool(ctx.fragment_ids_this_run)
+
+def record_rerun(scope, started):
+    # started: time.perf_counter() at the start of the scope's run
+    st.session_state.setdefault('rerun_ms', {})[scope] = (
+        (time.perf_counter() - started) * 1000,
+        "fragment" if is_fragment_rerun() else "full",
+    )
+
+def rerun_timing_sidebar():
+    # Shown as of the previous run, since the sidebar renders before the page
+    timings = st.session_state.get('rerun_ms')
+    if not timings:
+        return
+    lines = [
+        f"{scope}: {ms:.0f} ms ({kind} rerun)"
+        for scope, (ms, kind) in timings.items()
+    ]
+    st.sidebar.caption("Last rerun times  \n" + "  \n".join(lines))
@@ -0,0 +1,140 @@
+import json
+import time
+import streamlit as st
+from api.diff import diff_json
+from telemetry.timing import current_timeline
+
+# Longer values (e.g. base64 images in responses) are shortened in diff tables
+DIFF_VALUE_CHARS = 120
+
+def render_api_response(resp, success_message, timeline=None):
+    st.subheader("API Response")
+    if getattr(resp, 'from_cache', False):
+        age = time.time() - resp.cached_at
+        st.caption(f"Served from cache (stored {age:.0f}s ago); no request was sent.")
+    if resp.status_code == 200:
+        st.success(success_message)
+        st.json(resp.json())
+    else:
+        st.error(f"API request failed with status code: {resp.status_code}")
+        try:
+            st.json(resp.json())
+        except Exception:
+            st.code(resp.text)
+
+    if timeline is None:
+        timeline = current_timeline()
+    if timeline is not None and timeline.stages:
+        render_request_size(timeline)
+        render_timing_breakdown(timeline)
+
+def render_request_size(timeline):
+    # Before/after sizes of the uploaded body(ies) in this run
+    compressed = [stage for stage in timeline.stages if "uncompressed_bytes" in stage]
+    if compressed:
+        before = sum(stage["uncompressed_bytes"] for stage in compressed)
+        after = sum(stage["bytes"] for stage in compressed)
+        encodings = ", ".join(sorted({stage["encoding"] for stage in compressed}))
+        st.caption(f"Request body {before / 1024:,.0f} KB, sent as {after / 1024:,.0f} KB with {encodings} ({1 - after / before:.0%} smaller).")
+        return
+    sent = sum(stage.get("bytes") or 0 for stage in timeline.stages if stage["stage"].startswith("POST "))
+    if sent:
+        st.caption(f"Request body {sent / 1024:,.0f} KB, sent uncompressed.")
+
+def render_timing_breakdown(timeline):
+    with st.expander("Timing Breakdown", expanded=False):
+        rows = []
+        for stage in timeline.stages:
+            nbytes = stage.get("bytes")
+            rows.append({
+                "Stage": stage["stage"],
+                "Time (ms)": round(stage["seconds"] * 1000, 1),
+                "Payload (KB)": round(nbytes / 1024, 1) if nbytes is not None else None,
+                "Server (ms)": round(stage["server_seconds"] * 1000, 1) if "server_seconds" in stage else None,
+                "Response (KB)": round(stage["response_bytes"] / 1024, 1) if "response_bytes" in stage else None,
+            })
+        st.dataframe(rows, use_container_width=True)
+        st.caption(
+            f"Total {timeline.total_seconds() * 1000:.0f} ms across {len(rows)} stage(s) in this run. "
+            "Server time is measured until the response headers arrive, so it includes the upload."
+        )
+
+def _diff_value(value):
+    if value is None:
+        return ""
+    text = value if isinstance(value, str) else json.dumps(value)
+    return text if len(text) <= DIFF_VALUE_CHARS else text[:DIFF_VALUE_CHARS] + "…"
+
+def render_json_diff(left, right, left_label, right_label):
+    # Field-by-field comparison of two parsed JSON responses
+    changes = diff_json(left, right)
+    if not changes:
+        st.success("The responses are identical.")
+        return
+    st.caption(f"{len(changes)} field(s) differ.")
+    st.dataframe(
+        [
+            {"Field": change["field"], "Change": change["change"], left_label: _diff_value(change["left"]), right_label: _diff_value(change["right"])}
+            for change in changes
+        ],
+        use_container_width=True
+    )
+
+def _response_json(resp):
+    try:
+        return resp.json()
+    except Exception:
+        return resp.text
+
+def render_comparison(comparison, success_message):
+    # A pipeline.Comparison: latency per environment, both responses and their differences
+    st.subheader("Environment Comparison")
+    rows = []
+    for environment, result in comparison.results.items():
+        resp = result["response"]
+        server = [stage["server_seconds"] for stage in result["timeline"].stages if "server_seconds" in stage]
+        rows.append({
+            "Environment": environment,
+            "HTTP Status": resp.status_code if resp is not None else None,
+            "Journey ID": result["journey_id"],
+            "Request (ms)": round(result["seconds"] * 1000, 1),
+            "Server (ms)": round(sum(server) * 1000, 1) if server else None,
+            "Cached": bool(getattr(resp, 'from_cache', False)),
+        })
+    st.dataframe(rows, use_container_width=True, hide_index=True)
+    st.caption(
+        f"The requests took {comparison.overlapped_seconds() * 1000:.0f} ms side by side; "
+        f"one after the other would have taken about {comparison.sequential_seconds() * 1000:.0f} ms. "
+        f"{comparison.seconds * 1000:.0f} ms in all, journey IDs included."
+    )
+
+    columns = st.columns(len(comparison.results))
+    for column, (environment, result) in zip(columns, comparison.results.items()):
+        with column:
+            st.markdown(f"**{environment}**")
+            resp = result["response"]
+            if result["error"] is not None:
+                st.error(f"An error occurred: {result['error']}")
+            elif resp.status_code == 200:
+                st.success(success_message)
+                st.json(resp.json())
+            else:
+                st.error(f"API request failed with status code: {resp.status_code}")
+                body = _response_json(resp)
+                if isinstance(body, str):
+                    st.code(body)
+                else:
+                    st.json(body)
+            if result["timeline"].stages:
+                render_timing_breakdown(result["timeline"])
+
+    st.subheader("Response Differences")
+    responses = {
+        environment: _response_json(result["response"])
+        for environment, result in comparison.results.items() if result["response"] is not None
+    }
+    if len(responses) < 2:
+        st.info("Only one environment answered, so there is nothing to compare.")
+        return
+    (left_label, left), (right_label, right) = list(responses.items())[:2]
+    render_json_diff(left, right, left_label, right_label)
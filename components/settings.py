@@ -0,0 +1,20 @@
+import streamlit as st
+from api.client import BASE_URLS
+from api.compression import REQUEST_ENCODINGS
+
+# Labels map to api.compression settings; "Server default" defers to OKAYDOC_REQUEST_ENCODING
+REQUEST_ENCODING_OPTIONS = {"Server default": None, "Off": "identity", "Auto (probe endpoint)": "auto", **{encoding: encoding for encoding in REQUEST_ENCODINGS}}
+
+# Sidebar settings as read by the pages; the widgets themselves live in app.py
+def get_base_url():
+    return BASE_URLS[st.session_state.get('environment', 'DEMO')]
+
+def response_cache_enabled():
+    return st.session_state.get('response_cache_enabled', False)
+
+def request_encoding():
+    return REQUEST_ENCODING_OPTIONS[st.session_state.get('request_encoding', "Server default")]
+
+def compare_environments():
+    # Send each submission to every environment in BASE_URLS side by side
+    return st.session_state.get('compare_environments', False)
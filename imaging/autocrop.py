@@ -0,0 +1,160 @@
+import numpy as np
+from PIL import Image, ImageFilter
+from imaging.cache import LRUCache, content_digest
+from imaging.loader import load_preview
+from telemetry.timing import timed
+
+# Detection runs on a grayscale copy this size; JPEGs decode straight to it in draft mode
+DETECT_MAX_EDGE = 480
+# Edge pixels: gradient magnitude at least this fraction of the 99th percentile,
+# low enough to keep a low-contrast card border next to high-contrast print
+EDGE_LEVEL = 0.2
+# Edge pixels whose gradient direction is within this many degrees of a side's normal vote for it
+ANGLE_TOLERANCE = 4.0
+# A side is the outermost line whose votes reach this fraction of the strongest line's
+SIDE_FRACTION = 0.35
+# The document must span at least this fraction of the image in both directions
+MIN_EXTENT = 0.25
+# Skew below this many degrees isn't worth resampling the image for
+MIN_DESKEW = 0.5
+AUTOCROP_CACHE_ENTRIES = 256
+
+# Results per upload digest, shared by the editors and the submit path
+_detected = LRUCache(AUTOCROP_CACHE_ENTRIES, sizeof=lambda result: 1)
+
+def detection_gray(image):
+    # Grayscale float32 copy no larger than DETECT_MAX_EDGE, lightly smoothed so
+    # sensor noise and print texture don't outvote the document's outline.
+    # Returns (copy, copy/image scale).
+    if image.mode not in ("L", "RGB"):
+        image = image.convert("RGB")
+    longest = max(image.size)
+    scale = min(1.0, DETECT_MAX_EDGE / longest)
+    small = image
+    if scale < 1.0:
+        # Box-reduce by a whole factor first so the resize only touches a few pixels
+        factor = longest // DETECT_MAX_EDGE
+        if factor > 1:
+            small = small.reduce(factor)
+        small = small.resize((max(1, round(image.width * scale)), max(1, round(image.height * scale))), Image.BILINEAR)
+    gray = small.convert("L").filter(ImageFilter.GaussianBlur(1.5))
+    return np.asarray(gray, dtype=np.float32), gray.width / image.width
+
+def gradients(gray):
+    # Sobel over the interior pixels, as array slices
+    gx = (gray[:-2, 2:] + 2 * gray[1:-1, 2:] + gray[2:, 2:]) - (gray[:-2, :-2] + 2 * gray[1:-1, :-2] + gray[2:, :-2])
+    gy = (gray[2:, :-2] + 2 * gray[2:, 1:-1] + gray[2:, 2:]) - (gray[:-2, :-2] + 2 * gray[:-2, 1:-1] + gray[:-2, 2:])
+    return gx, gy
+
+def dominant_angle(theta, weights):
+    # Orientation shared by both pairs of sides: gradient directions folded
+    # into 0..90 degrees, in 0.5 degree bins, circularly smoothed
+    bins = np.bincount((theta % 90 * 2).astype(np.int64) % 180, weights=weights, minlength=180)
+    smoothed = bins + 0.5 * (np.roll(bins, 1) + np.roll(bins, -1))
+    peak = int(smoothed.argmax())
+    # Refine to the weighted mean of the peak and its neighbours
+    offsets = np.array([-1, 0, 1])
+    values = bins[(peak + offsets) % 180]
+    angle = (peak + (offsets * values).sum() / max(values.sum(), 1e-9)) / 2 + 0.25
+    return angle - 90 if angle >= 45 else angle
+
+def side_lines(xs, ys, theta, weights, normal, extent):
+    # Outermost pair of strong lines with the given normal (degrees), as
+    # distances from the origin along it, or None
+    selected = np.abs((theta - normal + 90) % 180 - 90) <= ANGLE_TOLERANCE
+    if not selected.any():
+        return None
+    radians = np.deg2rad(normal)
+    rho = xs[selected] * np.cos(radians) + ys[selected] * np.sin(radians)
+    offset = rho.min()
+    votes = np.bincount((rho - offset).astype(np.int64), weights=weights[selected])
+    votes = np.convolve(votes, np.ones(3), mode="same")
+    strong = np.flatnonzero(votes >= SIDE_FRACTION * votes.max())
+    first, last = strong[0], strong[-1]
+    # Settle on the crest of each side's ridge rather than its outer flank
+    while first + 1 < len(votes) and votes[first + 1] > votes[first]:
+        first += 1
+    while last > 0 and votes[last - 1] > votes[last]:
+        last -= 1
+    if last - first < MIN_EXTENT * extent:
+        return None
+    return first + offset + 0.5, last + offset + 0.5
+
+def intersect(normal_a, rho_a, normal_b, rho_b):
+    a, b = np.deg2rad(normal_a), np.deg2rad(normal_b)
+    x, y = np.linalg.solve([[np.cos(a), np.sin(a)], [np.cos(b), np.sin(b)]], [rho_a, rho_b])
+    return float(x), float(y)
+
+def rotate_point(point, angle, size):
+    # Where `point` lands after image.rotate(angle) about the centre (no expand)
+    cx, cy = size[0] / 2, size[1] / 2
+    radians = np.deg2rad(angle)
+    dx, dy = point[0] - cx, point[1] - cy
+    return cx + dx * np.cos(radians) + dy * np.sin(radians), cy - dx * np.sin(radians) + dy * np.cos(radians)
+
+@timed("detect document")
+def detect_document(image):
+    # Finds the document's outline in `image` from its four straight sides.
+    # Returns {"rotate": degrees for Image.rotate to straighten it,
+    # "crop_box": (left, top, right, bottom) in the straightened image,
+    # "corners": its four corners in `image`}, in `image` pixels; None if no
+    # outline stands out.
+    gray, scale = detection_gray(image)
+    if min(gray.shape) < 16:
+        return None
+    gx, gy = gradients(gray)
+    magnitude = np.hypot(gx, gy)
+    ys, xs = np.nonzero(magnitude > max(EDGE_LEVEL * np.percentile(magnitude, 99), 1.0))
+    if len(xs) < 32:
+        return None
+    weights = magnitude[ys, xs]
+    theta = np.rad2deg(np.arctan2(gy[ys, xs], gx[ys, xs])) % 180
+    xs, ys = xs + 1.0, ys + 1.0
+
+    skew = dominant_angle(theta, weights)
+    height, width = gray.shape
+    # Sides whose normal is near the x axis (left/right), then near the y axis (top/bottom)
+    vertical = side_lines(xs, ys, theta, weights, skew % 180, width)
+    horizontal = side_lines(xs, ys, theta, weights, (skew + 90) % 180, height)
+    if vertical is None or horizontal is None:
+        return None
+    corners = [
+        intersect(skew % 180, vertical[i], (skew + 90) % 180, horizontal[j])
+        for i, j in ((0, 0), (1, 0), (1, 1), (0, 1))
+    ]
+
+    angle = skew if abs(skew) >= MIN_DESKEW else 0.0
+    size = (width, height)
+    straightened = [rotate_point(corner, angle, size) for corner in corners]
+    # Back to `image` pixels, clipped to the image
+    left = max(0, round(min(x for x, _ in straightened) / scale))
+    top = max(0, round(min(y for _, y in straightened) / scale))
+    right = min(image.width, round(max(x for x, _ in straightened) / scale))
+    bottom = min(image.height, round(max(y for _, y in straightened) / scale))
+    if right - left < 2 or bottom - top < 2:
+        return None
+    return {
+        "rotate": round(float(angle), 2),
+        "crop_box": (left, top, right, bottom),
+        "corners": [(x / scale, y / scale) for x, y in corners],
+    }
+
+def detect_crop(data, digest=None):
+    # Auto-crop for uploaded bytes: {"rotate", "crop_box"} in full-resolution,
+    # EXIF-oriented pixels, ready to merge into an edits dict; None if no
+    # document was found. Cached per upload digest.
+    if digest is None:
+        digest = content_digest(data)
+    cached = _detected.get(digest)
+    if cached is not None:
+        return cached[0]
+    preview, scale = load_preview(data, DETECT_MAX_EDGE)
+    found = detect_document(preview)
+    result = None
+    if found is not None:
+        result = {
+            "rotate": found["rotate"],
+            "crop_box": tuple(round(value / scale) for value in found["crop_box"]),
+        }
+    _detected.put(digest, (result,))
+    return result
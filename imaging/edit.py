@@ -0,0 +1,96 @@
+import struct
+from PIL import Image, ImageEnhance, ImageOps, ImageStat
+
+# Modes the fused LUT path reproduces exactly; anything else goes through Pillow's enhancers
+FUSED_MODES = ("L", "LA", "RGB", "RGBA")
+IDENTITY_LUT = list(range(256))
+# Opaque black; ImageOps.expand's (0, 0, 0) fill is rejected by the single-band modes
+MARGIN_FILL = {"L": 0, "LA": (0, 255)}
+
+def _f32(value):
+    return struct.unpack("f", struct.pack("f", value))[0]
+
+def _blend_lut(degenerate, factor):
+    # Mirrors Pillow's ImagingBlend for a constant degenerate value:
+    # single-precision arithmetic, truncated and clipped to 0..255
+    alpha = _f32(factor)
+    lut = []
+    for value in range(256):
+        blended = _f32(degenerate + _f32(alpha * (value - degenerate)))
+        lut.append(min(255, max(0, int(blended))))
+    return lut
+
+def _band_lut(image, color_lut):
+    # Alpha is blended against itself by the enhancers, so it passes through unchanged
+    if image.mode in ("LA", "RGBA"):
+        return color_lut * (len(image.mode) - 1) + IDENTITY_LUT
+    return color_lut * len(image.mode)
+
+def _legacy_edits(image, brightness, contrast, margin):
+    edited = ImageEnhance.Brightness(image).enhance(brightness)
+    edited = ImageEnhance.Contrast(edited).enhance(contrast)
+    if margin > 0:
+        edited = ImageOps.expand(edited, border=margin, fill=(0, 0, 0))
+    return edited
+
+def apply_edits(image, brightness=1.0, contrast=1.0, margin=0, crop_box=None, rotate=0.0):
+    # rotate: degrees counter-clockwise about the centre, keeping the size (deskew);
+    # crop_box is (left, top, right, bottom) in the coordinates of the rotated `image`
+    edited = image.rotate(rotate, resample=Image.BICUBIC) if rotate else image
+    edited = edited.crop(crop_box) if crop_box is not None else edited
+    if edited.mode not in FUSED_MODES:
+        return _legacy_edits(edited, brightness, contrast, margin)
+
+    # Fold brightness and contrast into a single lookup table so the pixels are
+    # touched once, instead of once per enhancer plus their degenerate images
+    lut = _blend_lut(0, brightness)
+    if contrast != 1.0:
+        brightened = edited if lut == IDENTITY_LUT else edited.point(_band_lut(edited, lut))
+        gray = brightened if brightened.mode == "L" else brightened.convert("L")
+        mean = int(ImageStat.Stat(gray).mean[0] + 0.5)
+        contrast_lut = _blend_lut(mean, contrast)
+        lut = [contrast_lut[value] for value in lut]
+    if lut != IDENTITY_LUT:
+        edited = edited.point(_band_lut(edited, lut))
+
+    if margin > 0:
+        # Same canvas ImageOps.expand builds, filled with the LUT output directly
+        canvas = Image.new(edited.mode, (edited.width + 2 * margin, edited.height + 2 * margin), MARGIN_FILL.get(edited.mode, (0, 0, 0)))
+        canvas.paste(edited, (margin, margin))
+        edited = canvas
+    return edited
+
+def make_proxy(image, max_edge):
+    # Downscaled stand-in for interactive previews; returns (proxy, proxy/original scale)
+    longest = max(image.size)
+    if longest <= max_edge:
+        return image, 1.0
+    scale = max_edge / longest
+    size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+    return image.resize(size, reducing_gap=3.0), scale
+
+def scale_edits(edits, scale):
+    # Map full-resolution edit parameters onto an image scaled by `scale`
+    crop_box = edits['crop_box']
+    if crop_box is not None:
+        crop_box = tuple(round(v * scale) for v in crop_box)
+    return dict(edits, margin=round(edits['margin'] * scale), crop_box=crop_box)
+
+def edited_size(size, edits):
+    # Size apply_edits produces from an image of `size` (rotation keeps it)
+    width, height = size
+    if edits is not None:
+        if edits['crop_box'] is not None:
+            left, top, right, bottom = edits['crop_box']
+            width, height = right - left, bottom - top
+        width, height = width + 2 * edits['margin'], height + 2 * edits['margin']
+    return width, height
+
+def has_edits(edits):
+    return (
+        edits['brightness'] != 1.0 or
+        edits['contrast'] != 1.0 or
+        edits['margin'] != 0 or
+        edits['crop_box'] is not None or
+        edits.get('rotate', 0.0) != 0.0
+    )
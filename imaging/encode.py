@@ -0,0 +1,133 @@
+import io
+import os
+from PIL import Image, ImageOps
+from telemetry.timing import timed
+
+# Multi-picture JPEGs from phone cameras are plain JPEG to every consumer we send to
+FORMAT_ALIASES = {"JPG": "JPEG", "MPO": "JPEG"}
+
+# Profile keys forwarded to Image.save
+SAVE_OPTIONS = ("quality", "progressive", "subsampling", "optimize", "compress_level")
+EXIF_ORIENTATION = 0x0112
+MIN_QUALITY = 10
+MAX_QUALITY = 95
+
+# Named encoder profiles:
+#   format          output format for images that have to be (re-)encoded
+#   passthrough     send unedited uploads as-is when they already satisfy the profile
+#   max_long_edge   downscale so the longer side is at most this many pixels
+#   target_bytes    binary-search JPEG quality for the best image within this budget
+ENCODER_PROFILES = {
+    "Original, PNG for edits": {"format": "PNG", "optimize": True, "passthrough": True},
+    "Original, JPEG for edits": {"format": "JPEG", "passthrough": True},
+    "PNG lossless": {"format": "PNG", "optimize": True},
+    "PNG fast": {"format": "PNG", "compress_level": 1},
+    "JPEG q95 4:4:4": {"format": "JPEG", "quality": 95, "subsampling": 0},
+    "JPEG q85": {"format": "JPEG", "quality": 85},
+    "JPEG q85 progressive, 2048px": {"format": "JPEG", "quality": 85, "progressive": True, "max_long_edge": 2048},
+    "JPEG under 500 KB, 2048px": {"format": "JPEG", "quality": 90, "max_long_edge": 2048, "target_bytes": 500 * 1024},
+}
+
+# Defaults reproduce what each endpoint sent before profiles existed
+DEFAULT_PROFILES = {
+    "okayid": "Original, JPEG for edits",
+    "okaydoc": "Original, PNG for edits",
+    "passport": "Original, PNG for edits",
+    "okayface": "Original, JPEG for edits",
+    "okaylive": "Original, JPEG for edits",
+}
+
+# Cap on the long edge of submitted images per endpoint (0 disables it); bigger
+# uploads are downscaled instead of passed through. Override per endpoint with
+# e.g. OKAYDOC_MAX_EDGE_OKAYDOC=3000
+MAX_SUBMIT_EDGE = {
+    endpoint: int(os.environ.get(f"OKAYDOC_MAX_EDGE_{endpoint.upper()}", 4096))
+    for endpoint in DEFAULT_PROFILES
+}
+
+def cap_profile(profile, max_long_edge):
+    # Tighten a profile's max_long_edge to an endpoint cap
+    current = profile.get("max_long_edge")
+    if not max_long_edge or (current and current <= max_long_edge):
+        return profile
+    return dict(profile, max_long_edge=max_long_edge)
+
+def normalize_format(format):
+    format = (format or "").upper()
+    return FORMAT_ALIASES.get(format, format)
+
+def encode_image(image, format, **save_kwargs):
+    # Returns a zero-copy view of the encoded bytes
+    buffer = io.BytesIO()
+    image.save(buffer, format=format, **save_kwargs)
+    return buffer.getbuffer()
+
+def downscale(image, max_long_edge):
+    if not max_long_edge or max(image.size) <= max_long_edge:
+        return image
+    scale = max_long_edge / max(image.size)
+    size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+    # Lazily opened JPEGs then decode at a reduced DCT scale instead of full size
+    image.draft(image.mode, size)
+    return image.resize(size, Image.LANCZOS, reducing_gap=3.0)
+
+def _encode_within_budget(image, format, target_bytes, options):
+    # Highest quality whose output fits the budget; the lowest quality if none does
+    low, high = MIN_QUALITY, options.pop("quality", MAX_QUALITY)
+    best = None
+    while low <= high:
+        quality = (low + high) // 2
+        data = encode_image(image, format, quality=quality, **options)
+        if data.nbytes <= target_bytes:
+            best = data
+            low = quality + 1
+        else:
+            high = quality - 1
+    return best if best is not None else encode_image(image, format, quality=MIN_QUALITY, **options)
+
+def image_payload(image, source_bytes=None, profile=None, formats=("JPEG", "PNG"), **save_kwargs):
+    with timed("encode") as details:
+        data = _image_payload(image, source_bytes, profile, formats, **save_kwargs)
+        details["bytes"] = data.nbytes
+        details["passthrough"] = source_bytes is not None and data.obj is source_bytes
+    return data
+
+def _image_payload(image, source_bytes, profile, formats, **save_kwargs):
+    # Send the uploaded bytes untouched when the profile allows it and they are
+    # already in one of the endpoint's accepted `formats`; otherwise encode with the profile
+    if profile is None:
+        profile = ENCODER_PROFILES[DEFAULT_PROFILES["okaydoc"]]
+    formats = tuple(normalize_format(format) for format in formats)
+    max_long_edge = profile.get("max_long_edge")
+    target_bytes = profile.get("target_bytes")
+    if (
+        source_bytes is not None and
+        profile.get("passthrough") and
+        normalize_format(image.format) in formats and
+        (not max_long_edge or max(image.size) <= max_long_edge) and
+        (not target_bytes or len(source_bytes) <= target_bytes)
+    ):
+        return memoryview(source_bytes)
+
+    format = normalize_format(profile["format"])
+    image = downscale(image, max_long_edge)
+    if image.getexif().get(EXIF_ORIENTATION, 1) != 1:
+        # Re-encoding drops EXIF, so bake the orientation into the pixels
+        image = ImageOps.exif_transpose(image)
+    if format == "JPEG" and image.mode not in ("RGB", "L", "CMYK"):
+        image = image.convert("RGB")
+    options = {key: profile[key] for key in SAVE_OPTIONS if key in profile}
+    options.update(save_kwargs)
+    if target_bytes and format == "JPEG":
+        return _encode_within_budget(image, format, target_bytes, options)
+    return encode_image(image, format, **options)
+
+def describe_profile(profile):
+    parts = [profile["format"]]
+    for key in ("quality", "subsampling", "compress_level", "max_long_edge", "target_bytes"):
+        if key in profile:
+            parts.append(f"{key}={profile[key]}")
+    for key in ("progressive", "optimize", "passthrough"):
+        if profile.get(key):
+            parts.append(key)
+    return ", ".join(parts)
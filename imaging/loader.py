@@ -0,0 +1,52 @@
+import io
+import math
+from PIL import Image, ImageOps
+from imaging.edit import edited_size, make_proxy
+from imaging.encode import EXIF_ORIENTATION
+from telemetry.timing import timed
+
+# EXIF orientations that swap width and height
+TRANSPOSED_ORIENTATIONS = (5, 6, 7, 8)
+
+@timed("Image.open")
+def open_image(data):
+    # Lazy: only the header is parsed here; pixels decode on first use
+    return Image.open(io.BytesIO(data))
+
+def draft(image, max_edge, longest=None):
+    # JPEG only: decode straight from the DCT at 1/2, 1/4 or 1/8 scale, never
+    # below max_edge on the long side. A no-op for other formats or once loaded.
+    # longest: the long side, at full resolution, of what is finally kept of
+    # the image (e.g. after a crop), when that is less than the whole image.
+    longest = longest or max(image.size)
+    if max_edge and longest > max_edge:
+        scale = max_edge / longest
+        image.draft(image.mode, (math.ceil(image.width * scale), math.ceil(image.height * scale)))
+
+def _decode_oriented(data, max_edge, edits=None):
+    # Returns the EXIF-oriented image, decoded no larger than needed for
+    # max_edge, and its scale relative to the full-resolution oriented image.
+    # With edits, max_edge applies to the edited (cropped) result.
+    image = Image.open(io.BytesIO(data))
+    full_size = image.size
+    # Crop boxes are in oriented pixels; orientation doesn't change the long side
+    # of the result, only which side it is
+    oriented = full_size[::-1] if image.getexif().get(EXIF_ORIENTATION, 1) in TRANSPOSED_ORIENTATIONS else full_size
+    draft(image, max_edge, max(edited_size(oriented, edits)))
+    image.load()
+    ImageOps.exif_transpose(image, in_place=True)
+    return image, max(image.size) / max(full_size)
+
+@timed("decode preview")
+def load_preview(data, max_edge):
+    # Display proxy for the editors; returns (proxy, proxy/full-resolution scale)
+    image, scale = _decode_oriented(data, max_edge)
+    proxy, proxy_scale = make_proxy(image, max_edge)
+    return proxy, scale * proxy_scale
+
+@timed("full-resolution decode")
+def load_full(data, max_edge=None, edits=None):
+    # Submit path. With max_edge (the endpoint's resolution cap) JPEGs decode
+    # at the smallest DCT scale whose edited result (crop and margin in edits,
+    # full-resolution pixels) still covers it; returns (image, scale)
+    return _decode_oriented(data, max_edge, edits)
@@ -0,0 +1,115 @@
+import json
+import os
+import numpy as np
+from PIL import Image
+from imaging.edit import edited_size
+from telemetry.timing import timed
+
+# Images are analysed at this long edge so sharpness scores are comparable
+# between uploads; the editors' preview proxy is already this size
+ANALYSIS_MAX_EDGE = 800
+# Luma at or below / at or above these counts as clipped shadow / highlight
+DARK_LEVEL = 16
+BRIGHT_LEVEL = 240
+
+# Pre-flight thresholds per OkayDoc docType ("default" fills in the rest):
+#   min_short_edge   shorter side of the image as it will be submitted, in px
+#   min_sharpness    variance of the Laplacian of the analysis copy's luma,
+#                    stretched to the full 0-255 range so dim images aren't penalised
+#   min_brightness / max_brightness   mean luma, 0-255
+#   max_dark / max_bright             fraction of clipped pixels
+#   block            checks that stop the submission when blocking is enabled
+# Override or extend with a JSON file of the same shape in OKAYDOC_QUALITY_THRESHOLDS.
+QUALITY_THRESHOLDS = {
+    "default": {
+        "min_short_edge": 600,
+        "min_sharpness": 50.0,
+        "min_brightness": 50,
+        "max_brightness": 220,
+        "max_dark": 0.4,
+        "max_bright": 0.25,
+        "block": ["resolution", "blur"],
+    },
+    "mykad": {"min_short_edge": 640, "min_sharpness": 60.0},
+    "passport": {"min_short_edge": 800, "min_sharpness": 60.0},
+    "selfie": {"min_short_edge": 480, "min_sharpness": 25.0, "max_dark": 0.5, "block": ["resolution"]},
+}
+
+def load_thresholds(path=os.environ.get("OKAYDOC_QUALITY_THRESHOLDS")):
+    thresholds = {doc_type: dict(values) for doc_type, values in QUALITY_THRESHOLDS.items()}
+    if path:
+        with open(path) as f:
+            for doc_type, values in json.load(f).items():
+                thresholds.setdefault(doc_type, {}).update(values)
+    return thresholds
+
+_thresholds = load_thresholds()
+
+def thresholds_for(doc_type):
+    return {**_thresholds["default"], **_thresholds.get((doc_type or "").lower(), {})}
+
+def luma(image):
+    # Grayscale of the analysis copy as float32, never larger than ANALYSIS_MAX_EDGE
+    gray = image.convert("L")
+    longest = max(gray.size)
+    if longest > ANALYSIS_MAX_EDGE:
+        scale = ANALYSIS_MAX_EDGE / longest
+        gray = gray.resize((max(1, round(gray.width * scale)), max(1, round(gray.height * scale))), Image.BILINEAR)
+    return np.asarray(gray, dtype=np.float32)
+
+def stretch(gray, histogram):
+    # Map the 1st..99th percentile of luma onto 0..255
+    cumulative = np.cumsum(histogram) / gray.size
+    low, high = np.searchsorted(cumulative, 0.01), np.searchsorted(cumulative, 0.99)
+    if high - low < 2:
+        return gray
+    return (gray - low) * (255.0 / (high - low))
+
+def laplacian_variance(gray):
+    # 4-neighbour Laplacian over the interior pixels, as array slices
+    if min(gray.shape) < 3:
+        return 0.0
+    laplacian = (
+        gray[:-2, 1:-1] + gray[2:, 1:-1] + gray[1:-1, :-2] + gray[1:-1, 2:]
+        - 4 * gray[1:-1, 1:-1]
+    )
+    return float(laplacian.var())
+
+@timed("quality pre-check")
+def assess_quality(image, submit_size, doc_type=None):
+    # image: the edited image, at any scale; submit_size: its (width, height) as sent.
+    # Returns (metrics, issues) with issues as [{"check", "message", "block"}].
+    limits = thresholds_for(doc_type)
+    gray = luma(image)
+    histogram = np.bincount(gray.astype(np.uint8).ravel(), minlength=256)
+    metrics = {
+        "short_edge": min(submit_size),
+        "sharpness": laplacian_variance(stretch(gray, histogram)),
+        "brightness": float(gray.mean()),
+        "dark": float(histogram[:DARK_LEVEL + 1].sum() / gray.size),
+        "bright": float(histogram[BRIGHT_LEVEL:].sum() / gray.size),
+    }
+
+    issues = []
+    def fail(check, message):
+        issues.append({"check": check, "message": message, "block": check in limits["block"]})
+
+    if metrics["short_edge"] < limits["min_short_edge"]:
+        fail("resolution", f"Resolution too low: {submit_size[0]}x{submit_size[1]} px, the shorter side should be at least {limits['min_short_edge']} px")
+    if metrics["sharpness"] < limits["min_sharpness"]:
+        fail("blur", f"Image looks blurry: sharpness {metrics['sharpness']:.0f}, expected at least {limits['min_sharpness']:.0f}")
+    if metrics["brightness"] < limits["min_brightness"] or metrics["dark"] > limits["max_dark"]:
+        fail("exposure", f"Image looks underexposed: mean brightness {metrics['brightness']:.0f}, {metrics['dark']:.0%} of pixels near black")
+    elif metrics["brightness"] > limits["max_brightness"] or metrics["bright"] > limits["max_bright"]:
+        fail("exposure", f"Image looks overexposed or has glare: mean brightness {metrics['brightness']:.0f}, {metrics['bright']:.0%} of pixels near white")
+    return metrics, issues
+
+def submit_size(full_size, edits, max_long_edge=None):
+    # Size of the image that will be sent: full-resolution size after the crop
+    # and margin in edits, downscaled to the submit cap
+    width, height = edited_size(full_size, edits)
+    longest = max(width, height)
+    if max_long_edge and longest > max_long_edge:
+        scale = max_long_edge / longest
+        width, height = max(1, round(width * scale)), max(1, round(height * scale))
+    return width, height
@@ -0,0 +1,256 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from api.batch import IMAGE_EXTENSIONS, run_batch
+from api.client import BASE_URLS
+from api.history import record_submission
+from api.okaydoc import DEFAULT_API_PARAMS as OKAYDOC_DEFAULT_PARAMS, submit_okaydoc_api, submit_passport_api
+from api.okayface import submit_okayface_api
+from api.okayid import DEFAULT_API_PARAMS as OKAYID_DEFAULT_PARAMS, submit_okayid_api
+from api.okaylive import submit_okaylive_api
+from imaging.cache import content_digest
+from imaging.edit import apply_edits, has_edits, scale_edits
+from imaging.encode import ENCODER_PROFILES, DEFAULT_PROFILES, MAX_SUBMIT_EDGE, cap_profile, image_payload, normalize_format
+from imaging.loader import load_full, open_image
+from telemetry.timing import Timeline, current_timeline, export_timeline, timed
+
+NO_EDITS = {'brightness': 1.0, 'contrast': 1.0, 'margin': 0, 'crop_box': None, 'rotate': 0.0}
+# Pillow releases the GIL while decoding, editing and encoding, so the images
+# of a multi-image submission are prepared side by side
+PREPARE_WORKERS = 4
+
+_prepare_pool = None
+_prepare_lock = threading.Lock()
+
+# Image roles each endpoint takes, and which of them are required
+ENDPOINTS = {
+    "okaydoc": {"roles": ("image",), "required": ("image",)},
+    "passport": {"roles": ("half", "full"), "required": ("half",)},
+    "okayid": {"roles": ("front", "back"), "required": ("front", "back")},
+    "okayface": {"roles": ("idcard", "best"), "required": ("idcard", "best")},
+    "okaylive": {"roles": ("best",), "required": ("best",)},
+}
+
+def prepare_image(data, edits=None, profile=None, formats=("JPEG", "PNG"), keep_icc_profile=False, auto_crop=False):
+    # Decode, edit and encode one uploaded image: unedited uploads pass through
+    # when the profile allows it, otherwise pixels are only decoded here.
+    # auto_crop crops (and straightens) to the detected document unless edits crop already.
+    if auto_crop and (edits is None or edits['crop_box'] is None):
+        from imaging.autocrop import detect_crop
+        detected = detect_crop(data)
+        if detected is not None:
+            edits = {**(edits or NO_EDITS), **detected}
+    image = open_image(data)
+    save_kwargs = {}
+    if keep_icc_profile and image.info.get('icc_profile'):
+        save_kwargs['icc_profile'] = image.info['icc_profile']
+    if edits is None or not has_edits(edits):
+        return image_payload(image, data, profile, formats, **save_kwargs)
+    # Edits are in full-resolution, EXIF-oriented pixels; decode no larger than
+    # the profile's cap needs for the edited (cropped) image
+    image, scale = load_full(data, (profile or {}).get("max_long_edge"), edits)
+    with timed("full-resolution edit"):
+        edited = apply_edits(image, **scale_edits(edits, scale))
+    return image_payload(edited, profile=profile, formats=formats, **save_kwargs)
+
+def get_prepare_pool():
+    global _prepare_pool
+    with _prepare_lock:
+        if _prepare_pool is None:
+            _prepare_pool = ThreadPoolExecutor(max_workers=PREPARE_WORKERS, thread_name_prefix="okaydoc-prepare")
+        return _prepare_pool
+
+def prepare_images(tasks):
+    # tasks: {label: zero-argument callable returning an encoded payload}.
+    # Runs them concurrently and returns {label: payload} in the same order;
+    # stages they record land in the caller's timeline.
+    with timed("prepare images") as details:
+        details["images"] = len(tasks)
+        if len(tasks) < 2:
+            return {label: task() for label, task in tasks.items()}
+        pool = get_prepare_pool()
+        futures = {label: pool.submit(contextvars.copy_context().run, task) for label, task in tasks.items()}
+        return {label: future.result() for label, future in futures.items()}
+
+class Comparison:
+    # One encoded submission sent to several environments side by side.
+    # results: {environment: {"base_url", "journey_id", "response", "error",
+    # "seconds", "sent_at", "timeline"}}; seconds is the wall time for all of
+    # them, journey ID fetches included.
+    def __init__(self, results, seconds):
+        self.results = results
+        self.seconds = seconds
+
+    def overlapped_seconds(self):
+        # From the first request going out to the last response arriving
+        sent = [result for result in self.results.values() if result["sent_at"] is not None]
+        if not sent:
+            return 0.0
+        return max(result["sent_at"] + result["seconds"] for result in sent) - min(result["sent_at"] for result in sent)
+
+    def sequential_seconds(self):
+        # What sending them one after the other would have taken
+        return sum(result["seconds"] for result in self.results.values())
+
+def send_to_environments(send, targets):
+    # send(base_url, journey_id) -> response, called once per target at the
+    # same time. targets: {environment: (base_url, journey_id)}, where
+    # journey_id may be a callable fetching the environment's ID. The IDs are
+    # fetched side by side too, and the requests only go out once every target
+    # has one, so their latencies are measured over the same moment.
+    parent = current_timeline()
+    ready = threading.Barrier(len(targets))
+
+    def send_to(environment, base_url, journey_id):
+        # Each target gets its own copy of the stages so far (decode, encode)
+        timeline = parent.fork(environment=environment) if parent is not None else Timeline("compare", environment=environment)
+        timeline.activate()
+        result = {"base_url": base_url, "journey_id": None, "response": None, "error": None, "seconds": 0.0, "sent_at": None, "timeline": timeline}
+        try:
+            try:
+                result["journey_id"] = journey_id() if callable(journey_id) else journey_id
+            finally:
+                ready.wait()
+            result["sent_at"] = time.perf_counter()
+            try:
+                result["response"] = send(base_url, result["journey_id"])
+            finally:
+                result["seconds"] = time.perf_counter() - result["sent_at"]
+        except Exception as e:
+            result["error"] = e
+        return result
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(targets), thread_name_prefix="okaydoc-compare") as executor:
+        futures = {
+            environment: executor.submit(contextvars.copy_context().run, send_to, environment, base_url, journey_id)
+            for environment, (base_url, journey_id) in targets.items()
+        }
+        results = {environment: future.result() for environment, future in futures.items()}
+    return Comparison(results, time.perf_counter() - start)
+
+def effective_params(endpoint, params=None):
+    # API parameters as submit() sends them, with the endpoint's defaults filled in
+    params = dict(params or {})
+    if endpoint == "okaydoc":
+        return {**OKAYDOC_DEFAULT_PARAMS, **params}
+    if endpoint == "okayid":
+        return {**OKAYID_DEFAULT_PARAMS, **params}
+    return params
+
+def submit(endpoint, images, journey_id, params=None, base_url=None, profile=None, edits=None, use_cache=False, max_edge=None, content_encoding=None, auto_crop=False):
+    # images: {role: uploaded bytes}, with roles from ENDPOINTS[endpoint].
+    # max_edge caps the submitted long edge; defaults to MAX_SUBMIT_EDGE[endpoint], 0 disables it.
+    # content_encoding compresses the request body; see api.compression.
+    # auto_crop crops each image to its detected document; see imaging.autocrop
+    missing = [role for role in ENDPOINTS[endpoint]["required"] if images.get(role) is None]
+    if missing:
+        raise ValueError(f"{endpoint} needs image(s): {', '.join(missing)}")
+    if profile is None:
+        profile = ENCODER_PROFILES[DEFAULT_PROFILES[endpoint]]
+    profile = cap_profile(profile, MAX_SUBMIT_EDGE[endpoint] if max_edge is None else max_edge)
+    if base_url is None:
+        base_url = BASE_URLS['DEMO']
+    params = effective_params(endpoint, params)
+
+    if endpoint == "okaydoc":
+        img_data = prepare_image(images["image"], edits, profile, auto_crop=auto_crop)
+        return submit_okaydoc_api(img_data, journey_id, params, base_url=base_url, use_cache=use_cache, content_encoding=content_encoding)
+    if endpoint == "passport":
+        tasks = {"half": lambda: prepare_image(images["half"], edits, profile, auto_crop=auto_crop)}
+        if images.get("full") is not None:
+            tasks["full"] = lambda: prepare_image(images["full"], edits, profile, auto_crop=auto_crop)
+        payloads = prepare_images(tasks)
+        return submit_passport_api(payloads["half"], payloads.get("full"), journey_id, params.get("country", "OTHER"), base_url=base_url, use_cache=use_cache, content_encoding=content_encoding)
+    if endpoint == "okayid":
+        # The declared imageFormat always wins over the profile's format
+        img_format = normalize_format(params['imageFormat'])
+        profile = dict(profile, format=img_format)
+        payloads = prepare_images({
+            role: lambda role=role: prepare_image(images[role], edits, profile, formats=(img_format,), keep_icc_profile=True, auto_crop=auto_crop)
+            for role in ("front", "back")
+        })
+        return submit_okayid_api(payloads["front"], payloads["back"], journey_id, params, base_url=base_url, use_cache=use_cache, content_encoding=content_encoding)
+    # Multipart endpoints always take JPEG parts
+    profile = dict(profile, format="JPEG")
+    if endpoint == "okayface":
+        payloads = prepare_images({
+            role: lambda role=role: prepare_image(images[role], edits, profile, formats=("JPEG",), auto_crop=auto_crop)
+            for role in ("idcard", "best")
+        })
+        return submit_okayface_api(payloads["idcard"], payloads["best"], journey_id, params.get("livenessDetection", "true"), base_url=base_url, use_cache=use_cache, content_encoding=content_encoding)
+    if endpoint == "okaylive":
+        best_data = prepare_image(images["best"], edits, profile, formats=("JPEG",), auto_crop=auto_crop)
+        return submit_okaylive_api(best_data, journey_id, base_url=base_url, use_cache=use_cache, content_encoding=content_encoding)
+    raise ValueError(f"Unknown endpoint: {endpoint}")
+
+def collect_directory(endpoint, directory):
+    # One submission per image for single-image endpoints. Multi-image
+    # endpoints group files by a role suffix, e.g. mykad01_front.jpg + mykad01_back.jpg
+    roles = ENDPOINTS[endpoint]["roles"]
+    groups = {}
+    for filename in sorted(os.listdir(directory)):
+        path = os.path.join(directory, filename)
+        stem, extension = os.path.splitext(filename)
+        if not os.path.isfile(path) or extension.lower() not in IMAGE_EXTENSIONS:
+            continue
+        if len(roles) == 1:
+            groups[filename] = {roles[0]: path}
+            continue
+        name, _, role = stem.rpartition("_")
+        if name and role.lower() in roles:
+            groups.setdefault(name, {})[role.lower()] = path
+    return sorted(groups.items())
+
+def run_submissions(endpoint, items, journey_id, concurrency=4, **submit_kwargs):
+    # items: (name, {role: path}) pairs; yields one result record per item as it completes.
+    # journey_id may be a callable returning a separate ID for each item.
+    def submit_item(paths):
+        timeline = Timeline(endpoint, source="headless").activate()
+        images = {}
+        for role, path in paths.items():
+            with open(path, "rb") as f:
+                images[role] = f.read()
+        item_journey_id = journey_id() if callable(journey_id) else journey_id
+        response = submit(endpoint, images, item_journey_id, **submit_kwargs)
+        export_timeline(timeline)
+        record_submission(
+            endpoint, response, base_url=submit_kwargs.get("base_url") or BASE_URLS['DEMO'],
+            journey_id=item_journey_id, params=effective_params(endpoint, submit_kwargs.get("params")),
+            images={role: content_digest(data) for role, data in images.items()},
+            timeline=timeline, source="headless"
+        )
+        return response, timeline, item_journey_id
+
+    for index, result, error, elapsed in run_batch(items, submit_item, max_workers=concurrency):
+        name, paths = items[index]
+        record = {"item": name, "endpoint": endpoint, "files": paths, "elapsed_seconds": round(elapsed, 3)}
+        if error is not None:
+            record.update(status="error", error=str(error))
+        else:
+            response, timeline, item_journey_id = result
+            record.update(
+                journey_id=item_journey_id,
+                status="success" if response.status_code == 200 else "failed",
+                status_code=response.status_code,
+                from_cache=getattr(response, 'from_cache', False),
+                timings=timeline.stages
+            )
+            try:
+                record["response"] = response.json()
+            except ValueError:
+                record["response"] = response.text
+        yield record
+
+def run_directory(endpoint, directory, output_path, journey_id, concurrency=4, **submit_kwargs):
+    items = collect_directory(endpoint, directory)
+    succeeded = 0
+    with open(output_path, "a") as output:
+        for record in run_submissions(endpoint, items, journey_id, concurrency, **submit_kwargs):
+            succeeded += record["status"] == "success"
+            output.write(json.dumps(record) + "\n")
+            output.flush()
+    return succeeded, len(items)
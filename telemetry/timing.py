@@ -0,0 +1,99 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Optional exports, enabled by pointing these at writable files
+JSONL_PATH = os.environ.get("OKAYDOC_METRICS_JSONL")
+PROMETHEUS_PATH = os.environ.get("OKAYDOC_METRICS_PROM")
+
+_current = contextvars.ContextVar("okaydoc_timeline", default=None)
+_export_lock = threading.Lock()
+_stage_totals = {}
+
+class Timeline:
+    # Ordered stage timings for one script run or one submission
+    def __init__(self, name, **labels):
+        self.name = name
+        self.labels = labels
+        self.started_at = time.time()
+        self.stages = []
+
+    def activate(self):
+        _current.set(self)
+        return self
+
+    def fork(self, **labels):
+        # Copy for a background job: the stages so far, then the job's own
+        timeline = Timeline(self.name, **{**self.labels, **labels})
+        timeline.stages = list(self.stages)
+        return timeline
+
+    def add(self, stage, seconds, **details):
+        self.stages.append({"stage": stage, "seconds": seconds, **details})
+
+    def total_seconds(self):
+        return sum(stage["seconds"] for stage in self.stages)
+
+    def to_record(self):
+        return {
+            "timeline": self.name,
+            "started_at": self.started_at,
+            **self.labels,
+            "total_seconds": self.total_seconds(),
+            "stages": self.stages,
+        }
+
+def current_timeline():
+    return _current.get()
+
+@contextmanager
+def timed(stage, nbytes=None):
+    # Records into the active timeline, if any. Usable as a decorator too.
+    # Callers may add details (e.g. payload bytes) to the yielded dict.
+    details = {"bytes": nbytes}
+    start = time.perf_counter()
+    try:
+        yield details
+    finally:
+        timeline = _current.get()
+        if timeline is not None:
+            timeline.add(stage, time.perf_counter() - start, **details)
+
+def export_timeline(timeline):
+    if not (JSONL_PATH or PROMETHEUS_PATH):
+        return
+    with _export_lock:
+        if JSONL_PATH:
+            with open(JSONL_PATH, "a") as f:
+                f.write(json.dumps(timeline.to_record()) + "\n")
+        if PROMETHEUS_PATH:
+            for stage in timeline.stages:
+                totals = _stage_totals.setdefault((timeline.name, stage["stage"]), [0, 0.0, 0])
+                totals[0] += 1
+                totals[1] += stage["seconds"]
+                totals[2] += stage.get("bytes") or 0
+            # Write-then-rename so a scraping textfile collector never sees a partial file
+            tmp_path = PROMETHEUS_PATH + ".tmp"
+            with open(tmp_path, "w") as f:
+                f.write(prometheus_text())
+            os.replace(tmp_path, PROMETHEUS_PATH)
+
+def prometheus_text():
+    lines = [
+        "# HELP okaydoc_stage_seconds Time spent per submission stage.",
+        "# TYPE okaydoc_stage_seconds summary",
+    ]
+    for (endpoint, stage), (count, seconds, _) in sorted(_stage_totals.items()):
+        labels = f'endpoint="{endpoint}",stage="{stage}"'
+        lines.append(f"okaydoc_stage_seconds_sum{{{labels}}} {seconds}")
+        lines.append(f"okaydoc_stage_seconds_count{{{labels}}} {count}")
+    lines += [
+        "# HELP okaydoc_stage_bytes_total Payload bytes handled per submission stage.",
+        "# TYPE okaydoc_stage_bytes_total counter",
+    ]
+    for (endpoint, stage), (_, _, nbytes) in sorted(_stage_totals.items()):
+        lines.append(f'okaydoc_stage_bytes_total{{endpoint="{endpoint}",stage="{stage}"}} {nbytes}')
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,116 @@
+import json
+import streamlit as st
+from components.api_forms import okaydoc_api_params_form, get_encoder_profile, get_max_submit_edge
+from components.jobs import start_job, job_running, render_job
+from components.journey import get_journey_id, journey_credentials
+from components.settings import get_base_url, response_cache_enabled, request_encoding
+from api.batch import collect_batch_items, run_batch, MAX_BATCH_WORKERS
+from api.history import record_submission
+from api.journey import get_journey_manager
+from imaging.cache import content_digest
+from pipeline import submit
+from telemetry.timing import Timeline
+
+def batch_items(batch_files):
+    # Extracting an uploaded ZIP reads every image into memory, so it is only
+    # redone when the set of uploads changes, not on every rerun
+    uploads = tuple((uploaded.file_id, uploaded.name, uploaded.size) for uploaded in batch_files)
+    cached = st.session_state.get('batch_items')
+    if cached is None or cached[0] != uploads:
+        st.session_state['batch_items'] = (uploads, collect_batch_items(batch_files))
+    return st.session_state['batch_items'][1]
+
+def render():
+    st.title("OkayDoc Batch Submitter")
+    st.markdown("Upload multiple ID images, or a ZIP archive of images, to submit them all to OkayDoc")
+    batch_files = st.file_uploader("Upload ID Images or ZIP Archive", type=["png", "jpg", "jpeg", "zip"], accept_multiple_files=True, key="batch_files")
+    okaydoc_api_params_form()
+    concurrency = st.slider("Concurrency Limit", 1, MAX_BATCH_WORKERS, 4, 1, key="batch_concurrency_slider")
+    journey_per_image = st.checkbox(
+        "Separate Journey ID per Image", value=False, key="batch_journey_per_image",
+        help="IDs are pre-fetched in the background while the images are queued."
+    )
+    auto_crop = st.checkbox(
+        "Auto-crop Documents", value=False, key="batch_auto_crop",
+        help="Crop and straighten each image to its detected document outline before sending."
+    )
+    journey_id = get_journey_id(get_base_url())
+
+    items = []
+    if batch_files:
+        try:
+            items = batch_items(batch_files)
+        except Exception as e:
+            st.error(f"Could not read uploaded files: {e}")
+        st.info(f"Status: {len(items)} image(s) queued for submission.")
+        if journey_per_image and journey_id:
+            get_journey_manager().prefetch(get_base_url(), *journey_credentials(get_base_url()), len(items))
+
+    if st.button("Submit Batch to OkayDoc API", disabled=job_running("batch")):
+        if not journey_id:
+            st.error("Please get a Journey ID in the sidebar before submitting.")
+        elif not items:
+            st.error("Please upload at least one image.")
+        else:
+            api_params = dict(st.session_state.get('api_params', {}))
+            base_url = get_base_url()
+            _, profile = get_encoder_profile("okaydoc")
+            max_edge = get_max_submit_edge("okaydoc")
+            use_cache = response_cache_enabled()
+            content_encoding = request_encoding()
+            credentials = journey_credentials(base_url)
+
+            def submit_item(image_bytes):
+                item_journey_id = get_journey_manager().take(base_url, *credentials) if journey_per_image else journey_id
+                # Each image gets its own timeline for the submission history
+                timeline = Timeline("okaydoc", source="batch").activate()
+                response = submit("okaydoc", {"image": image_bytes}, item_journey_id, params=api_params, base_url=base_url, profile=profile, use_cache=use_cache, max_edge=max_edge, content_encoding=content_encoding, auto_crop=auto_crop)
+                record_submission(
+                    "okaydoc", response, base_url=base_url, journey_id=item_journey_id, params=api_params,
+                    images={"image": content_digest(image_bytes)}, timeline=timeline, source="batch"
+                )
+                return response
+
+            # The worker fills in rows as submissions complete; the page polls them
+            rows = [{"File": name, "Status": "Pending", "HTTP Status": None, "Time (s)": None, "Cached": False, "Response": ""} for name, _ in items]
+
+            def submit_batch():
+                for index, response, error, elapsed in run_batch(items, submit_item, max_workers=concurrency):
+                    row = rows[index]
+                    row["Time (s)"] = round(elapsed, 2)
+                    if error is not None:
+                        row["Status"] = "Error"
+                        row["Response"] = str(error)
+                    else:
+                        row["Status"] = "Success" if response.status_code == 200 else "Failed"
+                        row["HTTP Status"] = response.status_code
+                        row["Cached"] = getattr(response, 'from_cache', False)
+                        try:
+                            row["Response"] = json.dumps(response.json())
+                        except Exception:
+                            row["Response"] = response.text
+                return rows
+
+            st.session_state['batch_rows'] = rows
+            start_job("batch", f"Submitting {len(items)} image(s) to OkayDoc", submit_batch)
+
+    def render_batch_progress():
+        rows = st.session_state['batch_rows']
+        done = sum(1 for row in rows if row["Status"] != "Pending")
+        st.progress(done / len(rows), text=f"Submitted {done} of {len(rows)}")
+        st.dataframe(rows, use_container_width=True)
+
+    def render_batch_results(rows, job):
+        st.subheader("Batch Results")
+        succeeded = sum(1 for row in rows if row["Status"] == "Success")
+        st.markdown(f"**{succeeded} of {len(rows)}** submission(s) succeeded in {job.finished_at - job.started_at:.1f}s.")
+        st.dataframe(rows, use_container_width=True)
+        st.download_button(
+            "Download Results (JSON Lines)",
+            "\n".join(json.dumps(row) for row in rows),
+            file_name="okaydoc_batch_results.jsonl",
+            mime="application/json",
+            key="batch_results_download"
+        )
+
+    render_job("batch", render_batch_results, render_batch_progress)
@@ -0,0 +1,102 @@
+import datetime
+import streamlit as st
+from api.history import PAGE_SIZE, get_history
+from components.response_panel import render_json_diff, render_timing_breakdown
+from imaging.cache import content_digest
+from telemetry.timing import Timeline
+
+ENDPOINTS = ["", "okayid", "okaydoc", "passport", "okayface", "okaylive"]
+
+def format_time(timestamp):
+    return datetime.datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+
+def describe(row):
+    return f"#{row['id']} {row['endpoint']} {format_time(row['created_at'])} (HTTP {row['status_code']})"
+
+def history_filters():
+    with st.expander("Search", expanded=True):
+        col1, col2, col3 = st.columns(3)
+        journey_id = col1.text_input("Journey ID", key="history_journey_id").strip()
+        doc_type = col2.text_input("Document Type", key="history_doc_type").strip()
+        endpoint = col3.selectbox("Endpoint", ENDPOINTS, format_func=lambda name: name or "All", key="history_endpoint")
+        image_digest = st.text_input("Image Digest", key="history_image_digest").strip()
+        image_file = st.file_uploader("Or find the submissions of an image", type=["png", "jpg", "jpeg"], key="history_image")
+        if image_file is not None:
+            image_digest = content_digest(image_file.getvalue())
+            st.caption(f"Image digest: {image_digest}")
+    return {"journey_id": journey_id, "doc_type": doc_type, "image_digest": image_digest, "endpoint": endpoint}
+
+def render():
+    st.title("Submission History")
+    st.markdown("Submissions from this app and the CLI, with their responses, stored locally.")
+    history = get_history()
+    filters = history_filters()
+
+    # Keyset paging: the before_id of every page visited so far; back to the
+    # newest page whenever the search changes
+    if st.session_state.get('history_filters') != filters:
+        st.session_state['history_filters'] = filters
+        st.session_state['history_pages'] = [None]
+    pages = st.session_state['history_pages']
+    # One row more than a page, to know whether an older page exists
+    rows = history.search(before_id=pages[-1], limit=PAGE_SIZE + 1, **filters)
+    has_older = len(rows) > PAGE_SIZE
+    rows = rows[:PAGE_SIZE]
+
+    total = history.count(**filters)
+    if not rows:
+        st.info("No submissions found." if total == 0 else "No more submissions.")
+        return
+    st.caption(f"{total} submission(s), page {len(pages)} of {-(-total // PAGE_SIZE)}")
+    st.dataframe(
+        [
+            {
+                "ID": row["id"],
+                "Time": format_time(row["created_at"]),
+                "Endpoint": row["endpoint"],
+                "Environment": row["environment"],
+                "Journey ID": row["journey_id"],
+                "Doc Type": row["doc_type"],
+                "HTTP Status": row["status_code"],
+                "Cached": bool(row["from_cache"]),
+                "Time (ms)": round(row["total_seconds"] * 1000) if row["total_seconds"] is not None else None,
+                "Response (KB)": round(row["response_bytes"] / 1024, 1),
+                "Source": row["source"],
+            }
+            for row in rows
+        ],
+        use_container_width=True, hide_index=True
+    )
+    col1, col2 = st.columns(2)
+    col1.button("Newer", disabled=len(pages) == 1, on_click=pages.pop, key="history_newer_btn")
+    col2.button("Older", disabled=not has_older, on_click=pages.append, args=(rows[-1]["id"],), key="history_older_btn")
+
+    # Responses are only read and decompressed for the submissions shown
+    st.subheader("Submission Details")
+    by_id = {row["id"]: row for row in rows}
+    selected = st.selectbox("Submission", list(by_id), format_func=lambda submission_id: describe(by_id[submission_id]), key="history_selected")
+    record = history.get(selected)
+    st.caption(f"{record['base_url']} · journey {record['journey_id']}")
+    if record["images"]:
+        st.caption("Images: " + ", ".join(f"{role} {digest}" for role, digest in record["images"].items()))
+    with st.expander("Parameters", expanded=False):
+        st.json(record["params"])
+    if isinstance(record["response"], str):
+        st.code(record["response"])
+    else:
+        st.json(record["response"])
+    if record["timings"]:
+        timeline = Timeline(record["endpoint"])
+        timeline.stages = record["timings"]
+        render_timing_breakdown(timeline)
+
+    st.subheader("Compare Responses")
+    ids = list(by_id)
+    col1, col2 = st.columns(2)
+    left_id = col1.number_input("Submission A", min_value=1, value=ids[min(1, len(ids) - 1)], step=1, key="history_diff_left")
+    right_id = col2.number_input("Submission B", min_value=1, value=ids[0], step=1, key="history_diff_right")
+    left, right = history.get(int(left_id)), history.get(int(right_id))
+    if left is None or right is None:
+        st.warning(f"Submission #{int(left_id) if left is None else int(right_id)} is not in the history.")
+        return
+    render_json_diff(left["response"], right["response"], f"#{left['id']}", f"#{right['id']}")
@@ -0,0 +1,47 @@
+import streamlit as st
+from components.api_forms import okaydoc_api_params_form, get_encoder_profile
+from components.image_edit import image_editor, editor_blocked
+from components.jobs import start_page_submission, job_running, render_submission
+from components.journey import get_journey_id
+from components.quality import quality_precheck
+from components.settings import get_base_url, response_cache_enabled, request_encoding
+from api.okaydoc import submit_okaydoc_api
+from imaging.cache import content_digest
+from pipeline import prepare_image
+
+def render():
+    st.title("OkayDoc Non-Passport Submitter")
+    uploaded_file = st.file_uploader("Upload an ID Image", type=["png", "jpg", "jpeg"])
+    okaydoc_api_params_form()
+    journey_id = get_journey_id(get_base_url())
+
+    if uploaded_file is not None:
+        image_bytes = uploaded_file.getvalue()
+        st.subheader("Edit Image Parameters")
+        digest = content_digest(image_bytes)
+        edits = image_editor(
+            image_bytes, "doc", digest, "Status",
+            check=lambda edits: quality_precheck(image_bytes, edits, digest, "okaydoc", st.session_state.get('api_params', {}).get('docType'))
+        )
+
+        if st.button("Submit to OkayDoc API", disabled=job_running("okaydoc") or editor_blocked("doc")):
+            if not journey_id:
+                st.error("Please get a Journey ID in the sidebar before submitting.")
+            else:
+                # Unedited uploads are sent byte for byte unless the encoder profile says otherwise
+                profile_name, profile = get_encoder_profile("okaydoc")
+                api_params = dict(st.session_state.get('api_params', {}))
+                base_url = get_base_url()
+                use_cache = response_cache_enabled()
+                content_encoding = request_encoding()
+
+                def prepare_okaydoc():
+                    return {"ID Image": prepare_image(image_bytes, edits, profile)}
+
+                def send_okaydoc(payloads, base_url, journey_id):
+                    return submit_okaydoc_api(payloads["ID Image"], journey_id, api_params, base_url=base_url, use_cache=use_cache, content_encoding=content_encoding)
+
+                history = dict(endpoint="okaydoc", base_url=base_url, journey_id=journey_id, params=api_params, images={"image": digest})
+                start_page_submission("okaydoc", f"Sending request to API at {base_url}/api/ekyc/okaydoc ...", prepare_okaydoc, send_okaydoc, base_url, journey_id, description=f"Encoder profile '{profile_name}'", history=history)
+
+    render_submission("okaydoc", "Image successfully submitted!")
@@ -0,0 +1,66 @@
+import streamlit as st
+from components.api_forms import get_encoder_profile
+from components.image_edit import image_editor, editor_blocked
+from components.jobs import start_page_submission, job_running, render_submission
+from components.journey import get_journey_id
+from components.quality import quality_precheck
+from components.settings import get_base_url, response_cache_enabled, request_encoding
+from api.okayface import submit_okayface_api
+from imaging.cache import content_digest
+from pipeline import prepare_image, prepare_images
+
+def render():
+    st.title("OkayFace Submitter")
+    st.markdown("Upload Face Images (ID Card and Best)")
+    liveness = st.radio("Liveness Detection", options=["true", "false"], index=0, key="okayface_liveness")
+    idcard_file = st.file_uploader("Upload ID Card Image", type=["png", "jpg", "jpeg"], key="okayface_idcard")
+    best_file = st.file_uploader("Upload Best Face Image", type=["png", "jpg", "jpeg"], key="okayface_best")
+    idcard_edits = None
+    best_edits = None
+    idcard_blocked = False
+    best_blocked = False
+    if idcard_file is not None:
+        idcard_bytes = idcard_file.getvalue()
+        idcard_digest = content_digest(idcard_bytes)
+        st.subheader("Edit ID Card Image Parameters")
+        idcard_edits = image_editor(
+            idcard_bytes, "okayface_idcard", idcard_digest,
+            check=lambda edits: quality_precheck(idcard_bytes, edits, idcard_digest, "okayface")
+        )
+        idcard_blocked = editor_blocked("okayface_idcard")
+    if best_file is not None:
+        best_bytes = best_file.getvalue()
+        best_digest = content_digest(best_bytes)
+        st.subheader("Edit Best Face Image Parameters")
+        best_edits = image_editor(
+            best_bytes, "okayface_best", best_digest,
+            check=lambda edits: quality_precheck(best_bytes, edits, best_digest, "okayface", "selfie")
+        )
+        best_blocked = editor_blocked("okayface_best")
+    journey_id = get_journey_id(get_base_url())
+    if st.button("Submit OkayFace API Request", disabled=job_running("okayface") or idcard_blocked or best_blocked):
+        if not journey_id:
+            st.error("Please get a Journey ID in the sidebar before submitting.")
+        elif idcard_edits is None or best_edits is None:
+            st.error("Please upload and edit both ID Card and Best Face images.")
+        else:
+            # Multipart parts are always JPEG; unedited JPEG uploads pass through as-is
+            profile_name, profile = get_encoder_profile("okayface")
+            profile = dict(profile, format="JPEG")
+            base_url = get_base_url()
+            use_cache = response_cache_enabled()
+            content_encoding = request_encoding()
+
+            def prepare_okayface():
+                return prepare_images({
+                    "ID Card Image": lambda: prepare_image(idcard_bytes, idcard_edits, profile, formats=("JPEG",)),
+                    "Best Face Image": lambda: prepare_image(best_bytes, best_edits, profile, formats=("JPEG",))
+                })
+
+            def send_okayface(payloads, base_url, journey_id):
+                return submit_okayface_api(payloads["ID Card Image"], payloads["Best Face Image"], journey_id, liveness, base_url=base_url, use_cache=use_cache, content_encoding=content_encoding)
+
+            history = dict(endpoint="okayface", base_url=base_url, journey_id=journey_id, params={"livenessDetection": liveness}, images={"idcard": idcard_digest, "best": best_digest})
+            start_page_submission("okayface", "Submitting to OkayFace", prepare_okayface, send_okayface, base_url, journey_id, description=f"Encoder profile '{profile_name}'", history=history)
+
+    render_submission("okayface", "OkayFace API request successful!")
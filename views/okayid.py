@@ -0,0 +1,80 @@
+import streamlit as st
+from components.api_forms import okayid_api_params_form, get_encoder_profile
+from components.image_edit import image_editor, editor_blocked
+from components.jobs import start_page_submission, job_running, render_submission
+from components.journey import get_journey_id
+from components.quality import quality_precheck
+from components.settings import get_base_url, response_cache_enabled, request_encoding
+from api.okayid import submit_okayid_api
+from imaging.cache import content_digest
+from imaging.encode import normalize_format
+from pipeline import prepare_image, prepare_images
+
+def render():
+    st.title("OkayID Submitter")
+    st.markdown("Upload Front Image of ID")
+    front_file = st.file_uploader("Upload Front Image", type=["png", "jpg", "jpeg"], key="okayid_front")
+    st.markdown("Upload Back Image of ID")
+    back_file = st.file_uploader("Upload Back Image", type=["png", "jpg", "jpeg"], key="okayid_back")
+    
+    okayid_api_params_form()
+
+    front_edits = None
+    back_edits = None
+    front_blocked = False
+    back_blocked = False
+
+    # Each editor is a fragment, so adjusting one image doesn't rerun the other
+    if front_file is not None:
+        front_bytes = front_file.getvalue()
+        st.subheader("Edit Front Image Parameters")
+        front_digest = content_digest(front_bytes)
+        front_edits = image_editor(
+            front_bytes, "front", front_digest, "Front Image Status",
+            check=lambda edits: quality_precheck(front_bytes, edits, front_digest, "okayid")
+        )
+        front_blocked = editor_blocked("front")
+
+    if back_file is not None:
+        back_bytes = back_file.getvalue()
+        st.subheader("Edit Back Image Parameters")
+        back_digest = content_digest(back_bytes)
+        back_edits = image_editor(
+            back_bytes, "back", back_digest, "Back Image Status",
+            check=lambda edits: quality_precheck(back_bytes, edits, back_digest, "okayid")
+        )
+        back_blocked = editor_blocked("back")
+
+    journey_id = get_journey_id(get_base_url())
+
+    if st.button("Submit OkayID API Request", disabled=job_running("okayid") or front_blocked or back_blocked):
+        if not journey_id:
+            st.error("Please get a Journey ID in the sidebar before submitting.")
+        elif front_file is None or back_file is None:
+            st.error("Please upload both front and back images.")
+        else:
+            # Unedited uploads already in the declared format are sent byte for byte
+            api_params = dict(st.session_state.get('okayid_api_params', {}))
+            img_format = normalize_format(api_params.get('imageFormat', 'JPG'))
+            # The declared imageFormat always wins over the profile's format
+            profile_name, profile = get_encoder_profile("okayid")
+            profile = dict(profile, format=img_format)
+            base_url = get_base_url()
+            use_cache = response_cache_enabled()
+            content_encoding = request_encoding()
+
+            # Encoding and the API call run in the background so reruns are not held up
+            def prepare_okayid():
+                # Front and back are decoded, edited and encoded side by side
+                return prepare_images({
+                    "Front Image": lambda: prepare_image(front_bytes, front_edits, profile, formats=(img_format,), keep_icc_profile=True),
+                    "Back Image": lambda: prepare_image(back_bytes, back_edits, profile, formats=(img_format,), keep_icc_profile=True)
+                })
+
+            def send_okayid(payloads, base_url, journey_id):
+                return submit_okayid_api(payloads["Front Image"], payloads["Back Image"], journey_id, api_params, base_url=base_url, use_cache=use_cache, content_encoding=content_encoding)
+
+            history = dict(endpoint="okayid", base_url=base_url, journey_id=journey_id, params=api_params, images={"front": front_digest, "back": back_digest})
+            start_page_submission("okayid", "Submitting to OkayID", prepare_okayid, send_okayid, base_url, journey_id, description=f"Encoder profile '{profile_name}'", history=history)
+
+    render_submission("okayid", "OkayID API request successful!")
@@ -0,0 +1,50 @@
+import streamlit as st
+from components.api_forms import get_encoder_profile
+from components.image_edit import image_editor, editor_blocked
+from components.jobs import start_page_submission, job_running, render_submission
+from components.journey import get_journey_id
+from components.quality import quality_precheck
+from components.settings import get_base_url, response_cache_enabled, request_encoding
+from api.okaylive import submit_okaylive_api
+from imaging.cache import content_digest
+from pipeline import prepare_image
+
+def render():
+    st.title("OkayLive Submitter")
+    st.markdown("Upload Best Face Image for Liveness Check")
+    best_file = st.file_uploader("Upload Best Face Image", type=["png", "jpg", "jpeg"], key="okaylive_best")
+    best_edits = None
+    best_blocked = False
+    if best_file is not None:
+        best_bytes = best_file.getvalue()
+        best_digest = content_digest(best_bytes)
+        st.subheader("Edit Best Face Image Parameters")
+        best_edits = image_editor(
+            best_bytes, "okaylive_best", best_digest,
+            check=lambda edits: quality_precheck(best_bytes, edits, best_digest, "okaylive", "selfie")
+        )
+        best_blocked = editor_blocked("okaylive_best")
+    journey_id = get_journey_id(get_base_url())
+    if st.button("Submit OkayLive API Request", disabled=job_running("okaylive") or best_blocked):
+        if not journey_id:
+            st.error("Please get a Journey ID in the sidebar before submitting.")
+        elif best_edits is None:
+            st.error("Please upload and edit the Best Face image.")
+        else:
+            # Multipart parts are always JPEG; unedited JPEG uploads pass through as-is
+            profile_name, profile = get_encoder_profile("okaylive")
+            profile = dict(profile, format="JPEG")
+            base_url = get_base_url()
+            use_cache = response_cache_enabled()
+            content_encoding = request_encoding()
+
+            def prepare_okaylive():
+                return {"Best Face Image": prepare_image(best_bytes, best_edits, profile, formats=("JPEG",))}
+
+            def send_okaylive(payloads, base_url, journey_id):
+                return submit_okaylive_api(payloads["Best Face Image"], journey_id, base_url=base_url, use_cache=use_cache, content_encoding=content_encoding)
+
+            history = dict(endpoint="okaylive", base_url=base_url, journey_id=journey_id, images={"best": best_digest})
+            start_page_submission("okaylive", "Submitting to OkayLive", prepare_okaylive, send_okaylive, base_url, journey_id, description=f"Encoder profile '{profile_name}'", history=history)
+
+    render_submission("okaylive", "OkayLive API request successful!")
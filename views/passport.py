@@ -0,0 +1,71 @@
+import streamlit as st
+from components.api_forms import get_encoder_profile
+from components.image_edit import image_editor, editor_blocked
+from components.jobs import start_page_submission, job_running, render_submission
+from components.journey import get_journey_id
+from components.quality import quality_precheck
+from components.settings import get_base_url, response_cache_enabled, request_encoding
+from api.okaydoc import submit_passport_api
+from imaging.cache import content_digest
+from pipeline import prepare_image, prepare_images
+
+def render():
+    st.title("OkayDoc Passport Submitter")
+    st.markdown("Upload Passport Images (Half Size and Full Size)")
+    half_file = st.file_uploader("Upload Half Size Passport Image", type=["png", "jpg", "jpeg"], key="passport_half")
+    full_file = st.file_uploader("Upload Full Size Passport Image (optional)", type=["png", "jpg", "jpeg"], key="passport_full")
+    country = st.text_input("Country", value="OTHER", key="passport_country")
+
+    half_edits = None
+    full_edits = None
+    half_blocked = False
+    full_blocked = False
+    
+    if half_file is not None:
+        half_bytes = half_file.getvalue()
+        st.subheader("Edit Half Size Image Parameters")
+        half_digest = content_digest(half_bytes)
+        half_edits = image_editor(
+            half_bytes, "passport_half", half_digest, "Half Size Image Status",
+            check=lambda edits: quality_precheck(half_bytes, edits, half_digest, "passport", "passport")
+        )
+        half_blocked = editor_blocked("passport_half")
+
+    if full_file is not None:
+        full_bytes = full_file.getvalue()
+        st.subheader("Edit Full Size Image Parameters")
+        full_digest = content_digest(full_bytes)
+        full_edits = image_editor(
+            full_bytes, "passport_full", full_digest, "Full Size Image Status",
+            check=lambda edits: quality_precheck(full_bytes, edits, full_digest, "passport", "passport")
+        )
+        full_blocked = editor_blocked("passport_full")
+
+    journey_id = get_journey_id(get_base_url())
+
+    if st.button("Submit Passport Images to OkayDoc API", disabled=job_running("passport") or half_blocked or full_blocked):
+        if not journey_id:
+            st.error("Please get a Journey ID in the sidebar before submitting.")
+        elif half_file is None:
+            st.error("Please upload the half size image.")
+        else:
+            # Unedited uploads are sent byte for byte unless the encoder profile says otherwise
+            profile_name, profile = get_encoder_profile("passport")
+            base_url = get_base_url()
+            use_cache = response_cache_enabled()
+            content_encoding = request_encoding()
+
+            def prepare_passport():
+                tasks = {"Half Size Image": lambda: prepare_image(half_bytes, half_edits, profile)}
+                if full_file is not None:
+                    tasks["Full Size Image"] = lambda: prepare_image(full_bytes, full_edits, profile)
+                return prepare_images(tasks)
+
+            def send_passport(payloads, base_url, journey_id):
+                return submit_passport_api(payloads["Half Size Image"], payloads.get("Full Size Image"), journey_id, country, base_url=base_url, use_cache=use_cache, content_encoding=content_encoding)
+
+            images = {"half": half_digest, "full": full_digest if full_file is not None else None}
+            history = dict(endpoint="passport", base_url=base_url, journey_id=journey_id, params={"country": country}, images=images)
+            start_page_submission("passport", "Submitting passport images to OkayDoc", prepare_passport, send_passport, base_url, journey_id, description=f"Encoder profile '{profile_name}'", history=history)
+
+    render_submission("passport", "Passport images successfully submitted!")